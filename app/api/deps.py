@@ -1,9 +1,9 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from httpx import AsyncClient
 from functools import lru_cache
 
-from app.core.config import get_settings, Settings
+from app.core.config import get_settings
 from app.models.user import User
 from app.services.auth_service import FirebaseAuthService
 from app.services.clustering_service import ClusteringService
@@ -12,23 +12,31 @@ from app.services.embedding_service import EmbeddingService
 from app.services.s3_service import S3Service
 from app.services.database_service import DynamoDBService
 from app.services.description_service import DescriptionService
+from app.services.image_processing_service import ImageProcessingService
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=True)
 
 # Service Dependencies
-def get_s3_service(settings: Settings = Depends(get_settings)) -> S3Service:
-    return S3Service(settings)
+@lru_cache()
+def get_s3_service() -> S3Service:
+    # Cached so the presigned URL cache it holds is shared across requests.
+    return S3Service(get_settings())
 
-def get_db_service(settings: Settings = Depends(get_settings)) -> DynamoDBService:
-    return DynamoDBService(settings)
+@lru_cache()
+def get_db_service() -> DynamoDBService:
+    # Cached so every request shares its long-lived client and connection pool.
+    return DynamoDBService(get_settings())
 
-def get_description_service(settings: Settings = Depends(get_settings)) -> DescriptionService:
-    # DescriptionService holds an initialized model client; instantiate per-request
-    return DescriptionService(settings)
+@lru_cache()
+def get_description_service() -> DescriptionService:
+    # DescriptionService holds an initialized model client; build it once and reuse it.
+    return DescriptionService(get_settings())
 
-def get_auth_service(settings: Settings = Depends(get_settings)) -> FirebaseAuthService:
-    return FirebaseAuthService(settings)
+@lru_cache()
+def get_auth_service() -> FirebaseAuthService:
+    # Cached so the Firebase public keys it holds are fetched once, not per request.
+    return FirebaseAuthService(get_settings())
 
 @lru_cache()
 def get_embedding_service() -> EmbeddingService:
@@ -38,7 +46,7 @@ def get_embedding_service() -> EmbeddingService:
 @lru_cache()
 def get_clustering_service() -> ClusteringService:
     # This service is stateless, so it can be cached.
-    return ClusteringService()
+    return ClusteringService(use_sklearnex=get_settings().CLUSTERING_USE_SKLEARNEX)
 
 @lru_cache()
 def get_naming_service() -> NamingService:
@@ -46,20 +54,24 @@ def get_naming_service() -> NamingService:
     # get_settings() is also cached, so this is efficient.
     return NamingService(get_settings())
 
-# HTTP Client Dependency
-from typing import AsyncGenerator
+@lru_cache()
+def get_image_processing_service() -> ImageProcessingService:
+    # Owns the thumbnail process pool; one pool is shared by all requests.
+    return ImageProcessingService(get_settings().THUMBNAIL_WORKERS)
 
-async def get_http_client() -> AsyncGenerator[AsyncClient, None]:
-    async with AsyncClient() as client:
-        yield client
+# HTTP Client Dependency
+async def get_http_client(request: Request) -> AsyncClient:
+    # Shared, connection-pooled client created in the app's startup hook.
+    return request.app.state.http_client
 
 # User Dependency
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
     auth_service: FirebaseAuthService = Depends(get_auth_service)
 ) -> User:
     """
     Verifies the JWT token and returns the current user.
-    FastAPI runs this synchronous function in a thread pool.
+    Declared async so FastAPI does not hop to the thread pool on every
+    protected request.
     """
-    return auth_service.verify_token(token)
+    return await auth_service.verify_token_async(token)
@@ -51,7 +51,7 @@ async def login_for_access_token(
         return {"access_token": id_token, "token_type": "bearer"}
 
     except HTTPStatusError as e:
-        logger.warning(f"Failed login attempt for user: {username}")
+        logger.warning("Failed login attempt for user: %s", username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password.",
@@ -87,7 +87,7 @@ async def signup(
             )
         return {"access_token": id_token, "token_type": "bearer"}
     except HTTPStatusError as e:
-        logger.warning(f"Failed signup attempt for user: {username}")
+        logger.warning("Failed signup attempt for user: %s", username)
         detail = "Account creation failed."
         if e.response is not None:
             try:
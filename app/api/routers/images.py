@@ -2,6 +2,7 @@ import logging
 from typing import List
 
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from pydantic import TypeAdapter
 
 from app.api.deps import (
     get_current_user,
@@ -11,6 +12,7 @@ from app.api.deps import (
     get_clustering_service,
     get_naming_service,
     get_description_service,
+    get_image_processing_service,
 )
 from app.models.user import User
 from app.models.image import (
@@ -22,6 +24,7 @@ from app.services.naming_service import NamingService
 from app.services.s3_service import S3Service
 from app.services.database_service import DynamoDBService
 from app.services.description_service import DescriptionService
+from app.services.image_processing_service import ImageProcessingService
 from app.controllers.images import (
     upload_images_controller,
     list_user_images_controller,
@@ -30,12 +33,32 @@ from app.controllers.images import (
     get_clusters_controller,
 )
 from app.core.config import get_settings
-from fastapi.responses import StreamingResponse
-from io import BytesIO
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Object keys embed the image id, so the bytes behind a proxied URL never
+# change; let the browser keep them. 'private' because the routes are
+# per-user (authenticated), so shared caches must not store them.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=86400, immutable"
+
+# Serializers for responses built from stored records with model_construct.
+_image_list_json = TypeAdapter(List[ImageResponse])
+_image_json = TypeAdapter(ImageResponse)
+_cluster_list_json = TypeAdapter(List[ImageCluster])
+_cluster_response_json = TypeAdapter(ClusterResponse)
+
+
+def _json_response(adapter: TypeAdapter, content) -> Response:
+    """Serialize an already-typed response body straight to JSON.
+
+    Returning a model lets FastAPI validate it against ``response_model``
+    again; a Response is sent as is, so constructed models stay unvalidated.
+    ``response_model`` still documents the route.
+    """
+    return Response(adapter.dump_json(content), media_type="application/json")
+
 @router.post("/upload", response_model=List[ImageUploadResponse], status_code=status.HTTP_201_CREATED)
 async def upload_image(
     files: List[UploadFile] = File(...),
@@ -45,12 +68,15 @@ async def upload_image(
     embedding_service: EmbeddingService = Depends(get_embedding_service),
     description_service: DescriptionService = Depends(get_description_service),
     naming_service: NamingService = Depends(get_naming_service),
+    image_processing_service: ImageProcessingService = Depends(get_image_processing_service),
 ):
     """
     Upload one or more image files. Accepts multiple files in the `files` form field.
     Returns a list of ImageUploadResponse objects.
     """
-    return await upload_images_controller(files, current_user, s3_service, db_service, embedding_service, description_service, naming_service)
+    return await upload_images_controller(
+        files, current_user, s3_service, db_service, embedding_service, description_service, naming_service, image_processing_service
+    )
 
 @router.get("", response_model=List[ImageResponse])
 async def list_user_images(
@@ -59,7 +85,7 @@ async def list_user_images(
     db_service: DynamoDBService = Depends(get_db_service)
 ):
     """Lists all images for the authenticated user."""
-    return await list_user_images_controller(current_user, s3_service, db_service)
+    return _json_response(_image_list_json, await list_user_images_controller(current_user, s3_service, db_service))
 
 @router.get("/clusters", response_model=List[ImageCluster], summary="Get stored clusters")
 async def get_clusters(
@@ -67,9 +93,19 @@ async def get_clusters(
     db_service: DynamoDBService = Depends(get_db_service),
     s3_service: S3Service = Depends(get_s3_service),
 ):
-    return await get_clusters_controller(current_user, db_service, s3_service)
+    return _json_response(_cluster_list_json, await get_clusters_controller(current_user, db_service, s3_service))
+
+async def _redirect_to_object(s3_service: S3Service, object_key: str) -> RedirectResponse:
+    """Send the client straight to S3 instead of relaying the bytes ourselves.
+
+    Presigned URLs are cached per key, so this is usually a dict lookup.
+    """
+    url = await s3_service.generate_presigned_get_url(object_key)
+    if url is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
 
-# Proxy streaming endpoints (used when IMAGE_URL_MODE=proxy)
+# Proxy/redirect endpoints (used when IMAGE_URL_MODE is proxy or redirect)
 @router.get("/{image_id}/original", include_in_schema=False)
 async def stream_original(
     image_id: str,
@@ -78,15 +114,19 @@ async def stream_original(
     db_service: DynamoDBService = Depends(get_db_service),
 ):
     settings = get_settings()
-    if settings.IMAGE_URL_MODE != "proxy":
+    if settings.IMAGE_URL_MODE not in ("proxy", "redirect"):
         return {"detail": "Proxy mode is disabled"}
     record = await db_service.get_image_record(current_user.id, image_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
-    data = await s3_service.get_object(record["original_key"])
-    if data is None:
+    if settings.IMAGE_URL_MODE == "redirect":
+        return await _redirect_to_object(s3_service, record["original_key"])
+    stream = await s3_service.stream_object(record["original_key"])
+    if stream is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
-    return StreamingResponse(BytesIO(data), media_type=record.get("content_type") or "application/octet-stream")
+    body, headers = stream
+    headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return StreamingResponse(body, media_type=record.get("content_type") or "application/octet-stream", headers=headers)
 
 @router.get("/{image_id}/thumbnail", include_in_schema=False)
 async def stream_thumbnail(
@@ -96,17 +136,21 @@ async def stream_thumbnail(
     db_service: DynamoDBService = Depends(get_db_service),
 ):
     settings = get_settings()
-    if settings.IMAGE_URL_MODE != "proxy":
+    if settings.IMAGE_URL_MODE not in ("proxy", "redirect"):
         return {"detail": "Proxy mode is disabled"}
     record = await db_service.get_image_record(current_user.id, image_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
     if not record.get("thumbnail_key"):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not available")
-    data = await s3_service.get_object(record["thumbnail_key"])
-    if data is None:
+    if settings.IMAGE_URL_MODE == "redirect":
+        return await _redirect_to_object(s3_service, record["thumbnail_key"])
+    stream = await s3_service.stream_object(record["thumbnail_key"])
+    if stream is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Object not found")
-    return StreamingResponse(BytesIO(data), media_type="image/jpeg")
+    body, headers = stream
+    headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return StreamingResponse(body, media_type="image/jpeg", headers=headers)
 
 @router.get("/{image_id}", response_model=ImageResponse)
 async def get_image_details(
@@ -116,7 +160,7 @@ async def get_image_details(
     db_service: DynamoDBService = Depends(get_db_service)
 ):
     """Retrieves details for a specific image."""
-    return await get_image_details_controller(image_id, current_user, s3_service, db_service)
+    return _json_response(_image_json, await get_image_details_controller(image_id, current_user, s3_service, db_service))
 
 
 @router.post("/cluster", response_model=ClusterResponse, summary="Cluster user's images")
@@ -132,7 +176,8 @@ async def cluster_user_images(
     Clusters the authenticated user's images based on their embeddings.
     Optionally generates a descriptive name for each cluster using a vision model.
     """
-    return await cluster_user_images_controller(request, current_user, db_service, s3_service, clustering_service, naming_service)
+    response = await cluster_user_images_controller(request, current_user, db_service, s3_service, clustering_service, naming_service)
+    return _json_response(_cluster_response_json, response)
 
 
 # (Static routes are intentionally placed before the dynamic '/{image_id}' route to avoid shadowing.)
\ No newline at end of file
@@ -1,35 +1,259 @@
 import logging
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple
 from io import BytesIO
-from PIL import Image
+import os
+import time
 import uuid
 import asyncio
 
+import numpy as np
+
 from fastapi import UploadFile, HTTPException, status
 from starlette.concurrency import run_in_threadpool
 
 from app.models.user import User
 from app.models.image import ImageResponse, ImageUploadResponse, ClusterRequest, ClusterResponse, ImageCluster
-from app.services.clustering_service import ClusteringService
+from app.services.clustering_service import ClusteringService, UserEmbeddingStore
 from app.services.embedding_service import EmbeddingService
 from app.services.naming_service import NamingService
 from app.services.s3_service import S3Service
-from app.services.database_service import DynamoDBService
+from app.services.database_service import BatchWriter, DynamoDBService
 from app.services.description_service import DescriptionService
+from app.services.image_processing_service import ImageProcessingService
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Caps how many files are in the upload pipeline at once (per process),
+# which also bounds concurrent calls to the Azure OpenAI deployments.
+_upload_semaphore = asyncio.Semaphore(get_settings().UPLOAD_CONCURRENCY)
+
+# With EMBEDDING_STORAGE=list, embeddings are rounded to this many decimal
+# places (float32-level precision for unit vectors), which roughly halves
+# their size as DynamoDB numbers. Binary storage formats do not need it.
+EMBEDDING_DECIMALS = 8
+
+# Strong references to fire-and-forget tasks; the event loop only keeps weak
+# ones, so an unreferenced task could be garbage-collected mid-flight.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _new_image_id() -> str:
+    """Return a time-ordered UUIDv7 string for a new image.
+
+    Ids (and the S3 keys and DynamoDB sort keys built from them) sort by
+    creation time, so a user's images come back from DynamoDB in upload
+    order. Uses ``uuid.uuid7`` where available (Python 3.14+).
+    """
+    if hasattr(uuid, "uuid7"):
+        return str(uuid.uuid7())
+    # RFC 9562: 48-bit Unix ms timestamp, version 7, variant 0b10, random rest
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return str(uuid.UUID(int=value))
+
+
+def _image_response(
+    record: Dict[str, object],
+    original_url: Optional[str],
+    thumbnail_url: Optional[str],
+    **fields: object,
+) -> ImageResponse:
+    """Build an ImageResponse from a stored record without validating it.
+
+    Records come from our own DynamoDB serializer, so their types are already
+    right and ``model_construct`` can skip validation (client input is still
+    validated as usual). Only the stored ISO timestamp needs parsing. The
+    routes serialize these responses directly (see ``_json_response`` in the
+    router) so FastAPI does not validate them against ``response_model``.
+    """
+    return ImageResponse.model_construct(
+        id=record["image_id"],
+        filename=record["filename"],
+        uploaded_at=datetime.fromisoformat(record["uploaded_at"]),
+        original_url=original_url,
+        thumbnail_url=thumbnail_url,
+        embedding=record.get("embedding"),
+        description=record.get("description"),
+        width=record.get("width"),
+        height=record.get("height"),
+        size=record.get("size"),
+        **fields,
+    )
+
+
+async def _describe_and_embed(
+    model_input: bytes,
+    filename: Optional[str],
+    description_service: DescriptionService,
+    embedding_service: EmbeddingService,
+) -> Tuple[Optional[str], List[float]]:
+    # 1) description first, from a copy downscaled to what the model actually sees
+    try:
+        description = await description_service.generate_image_description(model_input)
+    except Exception:
+        logger.exception("Failed to generate description for image %s", filename)
+        description = None
+
+    # 2) embedding
+    try:
+        embedding = _normalize_embedding(await embedding_service.generate_embedding(description))
+    except Exception:
+        logger.exception("Failed to generate embedding for image %s", filename)
+        embedding = []
+
+    return description, embedding
+
+
+async def _store_derivatives(
+    content: bytes,
+    filename: Optional[str],
+    thumbnail_key: str,
+    s3_service: S3Service,
+    description_service: DescriptionService,
+    embedding_service: EmbeddingService,
+    image_processing_service: ImageProcessingService,
+) -> Tuple[Optional[str], List[float]]:
+    # Thumbnail and model input come from one decode in a worker process
+    # (CPU-bound), so the original crosses the process boundary only once.
+    thumbnail_bytes, model_input = await image_processing_service.create_derivatives(content)
+    # Don't pin the original through the model round trips below
+    del content
+    _, (description, embedding) = await asyncio.gather(
+        s3_service.upload_fileobj(file_obj=BytesIO(thumbnail_bytes), object_key=thumbnail_key, content_type="image/jpeg"),
+        _describe_and_embed(model_input, filename, description_service, embedding_service),
+    )
+    return description, embedding
+
+
+def _normalize_embedding(embedding: List[float]) -> List[float]:
+    """Return the embedding as a unit vector.
+
+    Normalizing once at write time means stored vectors can be compared with
+    a plain dot product. This is also the vector returned to the client, not
+    the raw model output. When embeddings are stored as a list of numbers it
+    is rounded to float32-level precision to keep items small.
+    """
+    if not embedding:
+        return embedding
+    v = np.array(embedding, dtype=np.float64)
+    norm = np.sqrt(v @ v)
+    if norm == 0:
+        return embedding
+    # In place: v is our own copy, so no temporaries for the divide or round
+    v /= norm
+    if get_settings().EMBEDDING_STORAGE == "list":
+        v.round(EMBEDDING_DECIMALS, out=v)
+    return v.tolist()
+
+
+async def _name_new_cluster(
+    user_id: str,
+    image_id: str,
+    cluster_id: int,
+    description: str,
+    db_service: DynamoDBService,
+    naming_service: NamingService,
+) -> None:
+    """Name a single-image cluster from its description (background task)."""
+    try:
+        cname = await naming_service.generate_cluster_name([description])
+        if cname:
+            # Conditional: a no-op if the image has been re-clustered meanwhile
+            await db_service.set_cluster_name(user_id, image_id, cluster_id, cname)
+    except Exception:
+        logger.exception("Failed to generate name for new cluster %s", cluster_id)
+
 
-def _create_thumbnail(image_content: bytes) -> BytesIO:
-    """CPU-bound thumbnail generation logic."""
-    img = Image.open(BytesIO(image_content)).convert("RGB")
-    img.thumbnail((256, 256))
-    out = BytesIO()
-    img.save(out, format="JPEG", quality=85)
-    out.seek(0)
-    return out
+async def _auto_assign_cluster(
+    record: Dict[str, object],
+    store: UserEmbeddingStore,
+    db_service: DynamoDBService,
+    naming_service: NamingService,
+) -> None:
+    """Attach a freshly stored image to the nearest existing cluster, or a new one.
+
+    ``store`` holds the user's existing clustered embeddings; the caller
+    builds it once per upload request. Sets ``cluster_id`` on ``record``; a
+    new cluster is named in the background.
+    """
+    user_id = record["user_id"]
+    image_id = record["image_id"]
+    embedding = record["embedding"]
+    description = record["description"]
+
+    # Simple heuristic: take user's images with cluster_id and try nearest by cosine
+    # Build representative vectors for clusters (mean embedding)
+    cluster_ids, centroids, cluster_sizes, cluster_means, cluster_stds = store.cluster_stats()
+    assigned = False
+    if cluster_ids.size and embedding:
+        # Normalize new embedding
+        e = np.asarray(embedding, dtype=np.float32)
+        e_sq_norm = e @ e
+        if e_sq_norm == 0:
+            logger.warning("New image embedding has zero norm; skipping auto-assign.")
+        else:
+            e *= 1.0 / np.sqrt(e_sq_norm)
+
+            # Similarity to every centroid in one matrix-vector product
+            sims = centroids @ e
+            # Only best and second-best matter: partial selection is O(C)
+            if sims.size > 1:
+                top2 = np.argpartition(sims, -2)[-2:]
+                second, best = top2[np.argsort(sims[top2])]
+                second_best_sim = float(sims[second])
+            else:
+                best = 0
+                second_best_sim = -1.0
+            best_cid, best_sim = int(cluster_ids[best]), float(sims[best])
+
+            # Adaptive acceptance criteria
+            base_threshold = 0.80
+            margin = 0.05  # require separation from 2nd best
+            tightness = 0.07  # how close to the cluster's typical cohesion we require
+
+            size = int(cluster_sizes[best])
+            mean_sim = float(cluster_means[best])
+            std_sim = float(cluster_stds[best])
+
+            # For tiny clusters, be stricter; for larger, use adaptive threshold
+            required = base_threshold
+            if size <= 1:
+                required = max(required, 0.92)
+            else:
+                # Demand the new point be close to the cluster's typical cohesion
+                required = max(required, mean_sim - tightness)
+                # Optionally also not too far below 1 std below mean (commented to avoid over-conservatism)
+                # required = max(required, mean_sim - std_sim)
+
+            accept = (best_sim >= required) and ((best_sim - second_best_sim) >= margin)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Auto-assign decision: best_cid=%s best_sim=%.3f second_best=%.3f size=%d mean=%.3f std=%.3f required=%.3f accept=%s",
+                    best_cid, best_sim, second_best_sim, size, mean_sim, std_sim, required, accept,
+                )
+
+            if accept:
+                await db_service.update_image_cluster(user_id, image_id, best_cid)
+                record["cluster_id"] = best_cid
+                assigned = True
+
+    # If not assigned to an existing cluster, create a new cluster id
+    if not assigned:
+        new_cid = (store.max_cluster_id + 1) if store.max_cluster_id is not None else 0
+        await db_service.update_image_cluster(user_id, image_id, new_cid)
+        record["cluster_id"] = new_cid
+        # Naming is another model round trip and not needed for the response,
+        # so it runs after the upload returns.
+        if description:
+            task = asyncio.create_task(
+                _name_new_cluster(user_id, image_id, new_cid, description, db_service, naming_service)
+            )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
 
 
 async def upload_images_controller(
@@ -40,175 +264,115 @@ async def upload_images_controller(
     embedding_service: EmbeddingService,
     description_service: DescriptionService,
     naming_service: NamingService,
+    image_processing_service: ImageProcessingService,
 ) -> List[ImageUploadResponse]:
-    responses: List[ImageUploadResponse] = []
+    # Files are processed concurrently, but cluster auto-assignment reads and
+    # extends the user's cluster ids, so it runs one file at a time.
+    assign_lock = asyncio.Lock()
+    # The user's records are queried once per request (on first assignment)
+    # into a contiguous embedding store, and each new record is appended as
+    # it is assigned, rather than re-querying the whole partition per file.
+    store: Optional[UserEmbeddingStore] = None
+    # Start that query now, so it overlaps the first file's S3 and model
+    # calls instead of running after them. New cluster ids are derived from
+    # it, so it must not be served from the cache.
+    existing_images = asyncio.ensure_future(db_service.get_user_images(current_user.id, fresh=True))
+
+    async def _process_one(file: UploadFile, writer: BatchWriter) -> ImageUploadResponse:
+        nonlocal store
+        async with _upload_semaphore:
+            try:
+                content = await file.read()
+                await file.close()
 
-    for file in files:
-        try:
-            content = await file.read()
-            await file.close()
+                # Header-only read; cheap compared to the full decode below
+                dimensions = image_processing_service.get_dimensions(content)
 
-            # Thumbnail generation (CPU-bound)
-            thumbnail_buf = await run_in_threadpool(_create_thumbnail, content)
+                image_id = _new_image_id()
+                original_key = f"images/original/{current_user.id}/{image_id}_{file.filename}"
+                thumbnail_key = f"images/thumbnail/{current_user.id}/{image_id}_{file.filename}.jpg"
 
-            # 1) description first
-            try:
-                description = await description_service.generate_image_description(content)
-            except Exception:
-                logger.exception("Failed to generate description for image %s", file.filename)
-                description = None
+                # The original upload doesn't depend on the rendering and model
+                # calls, so overlap them. BytesIO wraps the bytes without copying.
+                upload_original = s3_service.upload_fileobj(
+                    file_obj=BytesIO(content), object_key=original_key, content_type=file.content_type
+                )
+                store_derivatives = _store_derivatives(
+                    content, file.filename, thumbnail_key,
+                    s3_service, description_service, embedding_service, image_processing_service,
+                )
+                # Only those two coroutines keep the original alive from here, so
+                # it is freed once it is in S3 and decoded, rather than staying
+                # resident through the model calls, DB write and assign lock.
+                size = len(content)
+                del content
+                _, (description, embedding) = await asyncio.gather(upload_original, store_derivatives)
+
+                uploaded_at = datetime.now(timezone.utc).isoformat()
+
+                record: Dict[str, object] = {
+                    "user_id": current_user.id,
+                    "image_id": image_id,
+                    "filename": file.filename,
+                    "original_key": original_key,
+                    "thumbnail_key": thumbnail_key,
+                    "uploaded_at": uploaded_at,
+                    "content_type": file.content_type,
+                    "size": size,
+                    "embedding": embedding,
+                    "description": description,
+                }
+                if dimensions:
+                    record["width"], record["height"] = dimensions
+
+                _, original_url, thumbnail_url = await asyncio.gather(
+                    # Records finishing together share one BatchWriteItem call
+                    writer.put(record),
+                    s3_service.generate_presigned_get_url(original_key),
+                    s3_service.generate_presigned_get_url(thumbnail_key),
+                )
 
-            # 2) embedding
-            try:
-                embedding = await embedding_service.generate_embedding(description)
-            except Exception:
-                logger.exception("Failed to generate embedding for image %s", file.filename)
-                embedding = []
-
-            image_id = str(uuid.uuid4())
-            original_key = f"images/original/{current_user.id}/{image_id}_{file.filename}"
-            thumbnail_key = f"images/thumbnail/{current_user.id}/{image_id}_{file.filename}.jpg"
-
-            await s3_service.upload_fileobj(file_obj=BytesIO(content), object_key=original_key, content_type=file.content_type)
-            await s3_service.upload_fileobj(file_obj=thumbnail_buf, object_key=thumbnail_key, content_type="image/jpeg")
-
-            uploaded_at = datetime.now(timezone.utc).isoformat()
-
-            record: Dict[str, object] = {
-                "user_id": current_user.id,
-                "image_id": image_id,
-                "filename": file.filename,
-                "original_key": original_key,
-                "thumbnail_key": thumbnail_key,
-                "uploaded_at": uploaded_at,
-                "content_type": file.content_type,
-                "embedding": embedding,
-                "description": description,
-            }
-            await db_service.add_image_record(record)
-
-            # Attempt to assign new image into an existing cluster if any
-            try:
-                # Simple heuristic: fetch user's images with cluster_id and try nearest by cosine
-                user_images = await db_service.get_user_images(current_user.id)
-                # Build representative vectors for clusters (mean embedding)
-                from collections import defaultdict
-                import numpy as np
-                cluster_vecs: Dict[int, List[List[float]]] = defaultdict(list)
-                for rec in user_images:
-                    if rec.get("cluster_id") is not None and rec.get("embedding"):
-                        cluster_vecs[int(rec["cluster_id"])].append(rec["embedding"]) 
-                assigned = False
-                if cluster_vecs and embedding:
-                    # Normalize new embedding
-                    e = np.asarray(embedding, dtype=float)
-                    e_norm = np.linalg.norm(e)
-                    if e_norm == 0:
-                        logger.warning("New image embedding has zero norm; skipping auto-assign.")
-                    else:
-                        e = e / e_norm
-
-                        # Build per-cluster normalized embeddings and centroids
-                        centroids: Dict[int, np.ndarray] = {}
-                        cluster_sizes: Dict[int, int] = {}
-                        cluster_means: Dict[int, float] = {}
-                        cluster_stds: Dict[int, float] = {}
-
-                        for cid, vecs in cluster_vecs.items():
-                            X = np.asarray(vecs, dtype=float)
-                            if X.ndim != 2 or X.shape[0] == 0:
-                                continue
-                            # Normalize rows; filter zeros
-                            norms = np.linalg.norm(X, axis=1)
-                            mask = norms > 0
-                            if not np.any(mask):
-                                continue
-                            Xn = X[mask] / norms[mask][:, None]
-                            c = Xn.mean(axis=0)
-                            c_norm = np.linalg.norm(c)
-                            if c_norm == 0:
-                                continue
-                            c = c / c_norm
-                            sims = Xn @ c
-                            centroids[cid] = c
-                            cluster_sizes[cid] = Xn.shape[0]
-                            cluster_means[cid] = float(sims.mean())
-                            cluster_stds[cid] = float(sims.std(ddof=0))
-
-                        if centroids:
-                            # Compute similarities to centroids
-                            sims = {cid: float(e @ c) for cid, c in centroids.items()}
-                            # Sort to get best and second-best
-                            ranked = sorted(sims.items(), key=lambda kv: kv[1], reverse=True)
-                            best_cid, best_sim = ranked[0]
-                            second_best_sim = ranked[1][1] if len(ranked) > 1 else -1.0
-
-                            # Adaptive acceptance criteria
-                            base_threshold = 0.80
-                            margin = 0.05  # require separation from 2nd best
-                            tightness = 0.07  # how close to the cluster's typical cohesion we require
-
-                            size = cluster_sizes.get(best_cid, 1)
-                            mean_sim = cluster_means.get(best_cid, 0.0)
-                            std_sim = cluster_stds.get(best_cid, 0.0)
-
-                            # For tiny clusters, be stricter; for larger, use adaptive threshold
-                            required = base_threshold
-                            if size <= 1:
-                                required = max(required, 0.92)
-                            else:
-                                # Demand the new point be close to the cluster's typical cohesion
-                                required = max(required, mean_sim - tightness)
-                                # Optionally also not too far below 1 std below mean (commented to avoid over-conservatism)
-                                # required = max(required, mean_sim - std_sim)
-
-                            accept = (best_sim >= required) and ((best_sim - second_best_sim) >= margin)
-
-                            logger.info(
-                                "Auto-assign decision: best_cid=%s best_sim=%.3f second_best=%.3f size=%d mean=%.3f std=%.3f required=%.3f accept=%s",
-                                best_cid, best_sim, second_best_sim, size, mean_sim, std_sim, required, accept,
-                            )
-
-                            if accept:
-                                await db_service.update_image_cluster(current_user.id, image_id, best_cid)
-                                record["cluster_id"] = best_cid
-                                assigned = True
-
-                # If not assigned to an existing cluster, create a new cluster id
-                if not assigned:
-                    existing_cids = [int(rec["cluster_id"]) for rec in user_images if rec.get("cluster_id") is not None]
-                    new_cid = (max(existing_cids) + 1) if existing_cids else 0
-                    # Try generating a name using the single-image description if available
-                    cname = None
-                    try:
-                        if description:
-                            cname = await naming_service.generate_cluster_name([description])
-                    except Exception:
-                        logger.exception("Failed to generate name for new cluster")
-                    await db_service.update_image_cluster(current_user.id, image_id, new_cid, cname)
-                    record["cluster_id"] = new_cid
-                    if cname:
-                        record["cluster_name"] = cname
-            except Exception:
-                logger.exception("Failed to auto-assign cluster for new image %s", image_id)
-
-            original_url = await s3_service.generate_presigned_get_url(original_key)
-            thumbnail_url = await s3_service.generate_presigned_get_url(thumbnail_key)
-
-            responses.append(ImageUploadResponse(
-                id=image_id,
-                filename=file.filename,
-                original_url=original_url,
-                thumbnail_url=thumbnail_url,
-                embedding=embedding,
-                description=description,
-            ))
-
-        except Exception as e:
-            logger.exception("Failed to upload file %s", getattr(file, "filename", "<unknown>"))
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to process file {getattr(file,'filename','<unknown>')}: {e}")
-
-    return responses
+                # Attempt to assign new image into an existing cluster if any
+                try:
+                    async with assign_lock:
+                        if store is None:
+                            store = UserEmbeddingStore.from_records(await existing_images, dim=len(embedding) or None)
+                        await _auto_assign_cluster(record, store, db_service, naming_service)
+                        store.append(image_id, record.get("cluster_id"), embedding)
+                except Exception:
+                    logger.exception("Failed to auto-assign cluster for new image %s", image_id)
+
+                return ImageUploadResponse(
+                    id=image_id,
+                    filename=file.filename,
+                    original_url=original_url,
+                    thumbnail_url=thumbnail_url,
+                    embedding=embedding,
+                    description=description,
+                    width=record.get("width"),
+                    height=record.get("height"),
+                    size=record["size"],
+                    cluster_id=record.get("cluster_id"),
+                    cluster_name=record.get("cluster_name"),
+                )
+
+            except Exception as e:
+                logger.exception("Failed to upload file %s", getattr(file, "filename", "<unknown>"))
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to process file {getattr(file,'filename','<unknown>')}: {e}")
+
+    try:
+        # A TaskGroup cancels and awaits the other files when one fails, so
+        # none is still writing once the batch writer and prefetch are closed.
+        async with db_service.batch_writer() as writer:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(_process_one(file, writer)) for file in files]
+        return [task.result() for task in tasks]
+    except* HTTPException as failed:
+        # Report the first failed file, not the group
+        raise failed.exceptions[0] from None
+    finally:
+        # Unused if no file got as far as cluster assignment
+        existing_images.cancel()
 
 
 async def list_user_images_controller(
@@ -220,7 +384,7 @@ async def list_user_images_controller(
     image_records = await db_service.get_user_images(current_user.id)
 
     async def _build_response(record):
-        if settings.IMAGE_URL_MODE == "proxy":
+        if settings.IMAGE_URL_MODE in ("proxy", "redirect"):
             original_url = f"/api/v1/images/{record['image_id']}/original"
             thumbnail_url = f"/api/v1/images/{record['image_id']}/thumbnail" if record.get("thumbnail_key") else None
         else:
@@ -228,15 +392,7 @@ async def list_user_images_controller(
                 s3_service.generate_presigned_get_url(record["original_key"]),
                 s3_service.generate_presigned_get_url(record.get("thumbnail_key"))
             )
-        return ImageResponse(
-            id=record["image_id"],
-            filename=record["filename"],
-            uploaded_at=record["uploaded_at"],
-            original_url=original_url,
-            thumbnail_url=thumbnail_url,
-            embedding=record.get("embedding"),
-            description=record.get("description"),
-        )
+        return _image_response(record, original_url, thumbnail_url)
 
     tasks = [_build_response(record) for record in image_records]
     return await asyncio.gather(*tasks)
@@ -253,22 +409,16 @@ async def get_image_details_controller(
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
 
-    if settings.IMAGE_URL_MODE == "proxy":
+    if settings.IMAGE_URL_MODE in ("proxy", "redirect"):
         original_url = f"/api/v1/images/{record['image_id']}/original"
         thumbnail_url = f"/api/v1/images/{record['image_id']}/thumbnail" if record.get("thumbnail_key") else None
     else:
-        original_url = await s3_service.generate_presigned_get_url(record["original_key"])
-        thumbnail_url = await s3_service.generate_presigned_get_url(record.get("thumbnail_key"))
+        original_url, thumbnail_url = await asyncio.gather(
+            s3_service.generate_presigned_get_url(record["original_key"]),
+            s3_service.generate_presigned_get_url(record.get("thumbnail_key")),
+        )
 
-    return ImageResponse(
-        id=record["image_id"],
-        filename=record["filename"],
-        uploaded_at=record["uploaded_at"],
-        original_url=original_url,
-        thumbnail_url=thumbnail_url,
-        embedding=record.get("embedding"),
-        description=record.get("description"),
-    )
+    return _image_response(record, original_url, thumbnail_url)
 
 
 async def cluster_user_images_controller(
@@ -279,7 +429,8 @@ async def cluster_user_images_controller(
     clustering_service: ClusteringService,
     naming_service: NamingService,
 ) -> ClusterResponse:
-    image_records = await db_service.get_user_images(current_user.id)
+    # Every image's cluster is rewritten from this, so bypass the cache
+    image_records = await db_service.get_user_images(current_user.id, fresh=True)
     if not image_records:
         return ClusterResponse(clusters=[], unclustered=[])
 
@@ -314,15 +465,7 @@ async def cluster_user_images_controller(
             s3_service.generate_presigned_get_url(record["original_key"]),
             s3_service.generate_presigned_get_url(record.get("thumbnail_key"))
         )
-        return ImageResponse(
-            id=record["image_id"],
-            filename=record["filename"],
-            uploaded_at=record["uploaded_at"],
-            original_url=original_url,
-            thumbnail_url=thumbnail_url,
-            embedding=record.get("embedding"),
-            description=record.get("description"),
-        )
+        return _image_response(record, original_url, thumbnail_url)
 
     all_image_ids_in_response = [img_id for ids in clustered_image_ids.values() for img_id in ids] + unclustered_image_ids
     image_response_tasks = {img_id: _build_image_response(all_images_map[img_id]) for img_id in all_image_ids_in_response if img_id in all_images_map}
@@ -332,7 +475,7 @@ async def cluster_user_images_controller(
     for cluster_id, ids_in_cluster in clustered_image_ids.items():
         images_in_cluster = [image_responses_map[img_id] for img_id in ids_in_cluster if img_id in image_responses_map]
         if images_in_cluster:
-            clusters_response.append(ImageCluster(cluster_id=cluster_id, name=cluster_names.get(cluster_id), images=images_in_cluster))
+            clusters_response.append(ImageCluster.model_construct(cluster_id=cluster_id, name=cluster_names.get(cluster_id), images=images_in_cluster))
 
     unclustered_response = [image_responses_map[img_id] for img_id in unclustered_image_ids if img_id in image_responses_map]
 
@@ -347,7 +490,7 @@ async def cluster_user_images_controller(
     except Exception:
         logger.exception("Failed to persist cluster assignments to DB")
 
-    return ClusterResponse(clusters=clusters_response, unclustered=unclustered_response)
+    return ClusterResponse.model_construct(clusters=clusters_response, unclustered=unclustered_response)
 
 
 async def get_clusters_controller(
@@ -373,29 +516,24 @@ async def get_clusters_controller(
 
     settings = get_settings()
     # Build ImageCluster responses with URLs according to mode
-    clusters: List[ImageCluster] = []
-    for cid, recs in grouped.items():
-        async def _one(r: Dict) -> ImageResponse:
-            if settings.IMAGE_URL_MODE == "proxy":
-                original_url = f"/api/v1/images/{r['image_id']}/original"
-                thumbnail_url = f"/api/v1/images/{r['image_id']}/thumbnail" if r.get("thumbnail_key") else None
-            else:
-                original_url, thumbnail_url = await asyncio.gather(
-                    s3_service.generate_presigned_get_url(r["original_key"]),
-                    s3_service.generate_presigned_get_url(r.get("thumbnail_key")),
-                )
-            return ImageResponse(
-                id=r["image_id"],
-                filename=r["filename"],
-                uploaded_at=r["uploaded_at"],
-                original_url=original_url,
-                thumbnail_url=thumbnail_url,
-                embedding=r.get("embedding"),
-                description=r.get("description"),
-                cluster_id=cid,
-                cluster_name=names.get(cid),
+    async def _one(cid: int, r: Dict) -> ImageResponse:
+        if settings.IMAGE_URL_MODE in ("proxy", "redirect"):
+            original_url = f"/api/v1/images/{r['image_id']}/original"
+            thumbnail_url = f"/api/v1/images/{r['image_id']}/thumbnail" if r.get("thumbnail_key") else None
+        else:
+            original_url, thumbnail_url = await asyncio.gather(
+                s3_service.generate_presigned_get_url(r["original_key"]),
+                s3_service.generate_presigned_get_url(r.get("thumbnail_key")),
             )
-
-        images = await asyncio.gather(*[_one(r) for r in recs])
-        clusters.append(ImageCluster(cluster_id=cid, name=names.get(cid), images=images))
-    return clusters
+        return _image_response(r, original_url, thumbnail_url, cluster_id=cid, cluster_name=names.get(cid))
+
+    # One gather across every cluster's images, not one round per cluster
+    members = [(cid, r) for cid, recs in grouped.items() for r in recs]
+    responses = await asyncio.gather(*[_one(cid, r) for cid, r in members])
+    images_by_cluster: Dict[int, List[ImageResponse]] = defaultdict(list)
+    for (cid, _), image in zip(members, responses):
+        images_by_cluster[cid].append(image)
+    return [
+        ImageCluster.model_construct(cluster_id=cid, name=names.get(cid), images=images)
+        for cid, images in images_by_cluster.items()
+    ]
@@ -1,6 +1,6 @@
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -20,8 +20,24 @@ class Settings(BaseSettings):
     S3_SSE_KMS_KEY_ID: Optional[str] = None          # required if using 'aws:kms'
     S3_ACL: Optional[str] = None                     # e.g., 'bucket-owner-full-control'
     S3_ADDRESSING_STYLE: Optional[str] = None        # 'virtual' or 'path'
-    # How to return image URLs: 'presigned' (default) or 'proxy'
+    # HTTP connections each AWS client (S3, DynamoDB) may keep open; botocore
+    # defaults to 10, which concurrent uploads would queue behind
+    AWS_MAX_POOL_CONNECTIONS: int = 64
+    # How to return image URLs: 'presigned' (default), 'proxy' or 'redirect'
+    # ('redirect' hands out API routes that 307 to a presigned S3 URL)
     IMAGE_URL_MODE: str = "presigned"
+    # Max files processed concurrently by the upload endpoint (per process)
+    UPLOAD_CONCURRENCY: int = 8
+    # Image worker processes for thumbnails/model inputs (defaults to CPU count)
+    THUMBNAIL_WORKERS: Optional[int] = None
+    # How new embeddings are written to DynamoDB: 'float32' (default, binary;
+    # ~4x smaller than a list), 'float16' (binary; ~8x smaller), 'int8'
+    # (binary, quantized with a per-vector scale; ~10x smaller) or 'list'
+    # (numbers). All formats stay readable.
+    EMBEDDING_STORAGE: Literal["float32", "float16", "int8", "list"] = "float32"
+    # Run KMeans through Intel's scikit-learn extension (pip install
+    # scikit-learn-intelex); much faster on x86. Ignored if not installed.
+    CLUSTERING_USE_SKLEARNEX: bool = False
 
     #OPENAI Configuration
     AZURE_OPENAI_API_KEY: SecretStr
@@ -29,6 +45,11 @@ class Settings(BaseSettings):
     AZURE_OPENAI_DEPLOYMENT_NAME: str
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME: str
     AZURE_OPENAI_ENDPOINT: str
+    # Truncate embeddings to this many dimensions (text-embedding-3-* only).
+    # Smaller vectors mean less to store, fetch and cluster on every request.
+    # Changing it once embeddings are stored needs a re-embed migration: until
+    # then, records of the old width are left out of clustering.
+    AZURE_OPENAI_EMBEDDING_DIMENSIONS: Optional[int] = None
 
     # Firebase Configuration
     FIREBASE_API_KEY: str
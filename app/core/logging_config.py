@@ -1,39 +1,79 @@
+import atexit
+import copy
 import logging
+import logging.handlers
+import queue
 import sys
+from typing import Optional
 from app.core.config import get_settings
 
+# Drains the log queue on a background thread; see setup_logging().
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that leaves exc_info on the record.
+
+    The stock prepare() formats the record and drops exc_info, so the output
+    handler only ever sees the traceback as plain text (no rich tracebacks).
+    Records never leave the process, so they need not be made picklable.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge args now; they could be mutated before the listener runs
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def stop_logging():
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 def setup_logging():
     """
     Configures logging for the entire application.
-    
+
     This setup provides structured, colored logs for development and
     can be easily adapted for production JSON logging.
+
+    Loggers only put records on an in-memory queue; a QueueListener thread
+    does the formatting and the blocking writes to stdout, so logging from
+    request handlers never stalls the event loop.
     """
+    global _listener
     settings = get_settings()
     log_level = settings.LOG_LEVEL.upper()
 
-    # Base logger configuration
-    logging.basicConfig(
-        level=log_level,
-        stream=sys.stdout,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-
-    # Make uvicorn use the root logger config
-    logging.getLogger("uvicorn.access").handlers = logging.getLogger().handlers
-    logging.getLogger("uvicorn.error").handlers = logging.getLogger().handlers
-    
     # Add color for development if rich is installed
     try:
         from rich.logging import RichHandler
-        logging.basicConfig(
-            level=log_level,
-            force=True, # Override basicConfig
-            format="%(message)s",
-            datefmt="[%X]",
-            handlers=[RichHandler(rich_tracebacks=True, show_path=False)],
-        )
-        logging.info("Rich logger enabled for development.")
+        handler = RichHandler(rich_tracebacks=True, show_path=False)
+        handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+        rich_enabled = True
     except ImportError:
-        logging.info("Rich library not found. Using standard logger.")
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        rich_enabled = False
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    logging.basicConfig(level=log_level, force=True, handlers=[queue_handler])
+
+    if _listener is None:
+        atexit.register(stop_logging)
+    else:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
 
+    # Make uvicorn use the root logger config
+    logging.getLogger("uvicorn.access").handlers = [queue_handler]
+    logging.getLogger("uvicorn.error").handlers = [queue_handler]
+
+    if rich_enabled:
+        logging.info("Rich logger enabled for development.")
+    else:
+        logging.info("Rich library not found. Using standard logger.")
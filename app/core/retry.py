@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import logging
+import random
+from typing import Optional, Tuple, Type
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt: connection failures, timeouts, throttling and
+# 5xx responses (e.g. a proxy's 502). Bad requests and auth errors are not.
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+# Never wait longer than this between attempts, whatever Retry-After says
+MAX_DELAY = 20.0
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After header), if any."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def async_retry(
+    max_attempts: int = 3,
+    base_delay: float = 0.5,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+):
+    """Retry an async function on transient errors with exponential backoff.
+
+    Waits ``base_delay * 2**n`` plus up to as much again in random jitter, so
+    callers throttled together don't retry in lockstep; a Retry-After header
+    on the error takes precedence. The last error is re-raised once
+    ``max_attempts`` calls have failed; other exceptions propagate at once.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return await fn(*args, **kwargs)
+                except retry_on as e:
+                    if attempt == max_attempts:
+                        raise
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = base_delay * 2 ** (attempt - 1)
+                        delay += random.uniform(0, delay)
+                    delay = min(delay, MAX_DELAY)
+                    logger.warning(
+                        "%s failed (attempt %d/%d), retrying in %.2fs: %s",
+                        fn.__qualname__, attempt, max_attempts, delay, e,
+                    )
+                    await asyncio.sleep(delay)
+        return wrapper
+    return decorator
@@ -9,10 +9,14 @@ class ImageBase(BaseModel):
     uploaded_at: datetime
     embedding: Optional[List[float]] = None
     description: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    size: Optional[int] = None
     cluster_id: Optional[int] = None
     cluster_name: Optional[str] = None
-    original_url: Optional[HttpUrl] = None
-    thumbnail_url: Optional[HttpUrl] = None
+    # Presigned S3 URLs, or relative API routes in proxy/redirect mode
+    original_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
 
 class ImageResponse(ImageBase):
     """
@@ -30,6 +34,9 @@ class ImageUploadResponse(BaseModel):
     thumbnail_url: HttpUrl
     embedding: List[float]
     description: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    size: Optional[int] = None
     cluster_id: Optional[int] = None
     cluster_name: Optional[str] = None
 
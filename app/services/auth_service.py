@@ -1,5 +1,15 @@
+import asyncio
+import hashlib
 import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
 import firebase_admin
+import httpx
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
 from firebase_admin import auth, credentials
 from fastapi import HTTPException, status
 from app.models.user import User
@@ -7,7 +17,20 @@ from app.core.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Google's x509 certificates for Firebase ID tokens, keyed by "kid"
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
 class FirebaseAuthService:
+    # Used when the certificate response carries no Cache-Control max-age.
+    DEFAULT_CERTS_TTL = 3600
+    # Verified tokens are remembered for this long (never past their own
+    # expiry), so a client re-sending the same token skips the RSA check.
+    VERIFIED_TOKEN_TTL = 300
+    VERIFIED_TOKEN_CACHE_SIZE = 4096
+
     def __init__(self, settings: Settings):
         try:
             firebase_admin.get_app()
@@ -23,6 +46,13 @@ class FirebaseAuthService:
             firebase_admin.initialize_app(cred, {"projectId": settings.GOOGLE_CLOUD_PROJECT})
             logger.info("Firebase app initialized successfully.")
 
+        self.project_id = settings.GOOGLE_CLOUD_PROJECT or firebase_admin.get_app().project_id
+        self._public_keys: Dict[str, Any] = {}
+        self._keys_expire_at = 0.0
+        self._keys_lock = asyncio.Lock()
+        # token digest -> (user, monotonic deadline), kept in LRU order
+        self._user_cache: "OrderedDict[bytes, Tuple[User, float]]" = OrderedDict()
+
     def verify_token(self, token: str) -> User:
         try:
             decoded_token = auth.verify_id_token(token)
@@ -33,7 +63,7 @@ class FirebaseAuthService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="User email not found in token."
                 )
-            logger.info(f"Token verified for user: {user_id}")
+            logger.info("Token verified for user: %s", user_id)
             return User(id=user_id, email=email)
         except auth.ExpiredIdTokenError:
             logger.warning("Token has expired.")
@@ -43,9 +73,139 @@ class FirebaseAuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         except Exception as e:
-            logger.error(f"Invalid token or authentication error: {e}")
+            logger.error("Invalid token or authentication error: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+    async def _get_public_keys(self) -> Dict[str, Any]:
+        """
+        Returns Google's token-signing public keys, refetching them once the
+        Cache-Control lifetime of the last response has passed.
+        """
+        if time.monotonic() < self._keys_expire_at:
+            return self._public_keys
+        async with self._keys_lock:
+            if time.monotonic() < self._keys_expire_at:
+                return self._public_keys
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(FIREBASE_CERTS_URL)
+                response.raise_for_status()
+            self._public_keys = {
+                kid: load_pem_x509_certificate(pem.encode()).public_key()
+                for kid, pem in response.json().items()
+            }
+            match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+            ttl = int(match.group(1)) if match else self.DEFAULT_CERTS_TTL
+            self._keys_expire_at = time.monotonic() + ttl
+        return self._public_keys
+
+    def _decode_token(self, token: str, keys: Dict[str, Any]) -> Dict[str, Any]:
+        """Checks the signature and the claims the Admin SDK checks for ID tokens."""
+        key = keys.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise jwt.InvalidTokenError("Token was not signed by a known Firebase key.")
+        claims = jwt.decode(
+            token,
+            key=key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=f"https://securetoken.google.com/{self.project_id}",
+            options={"require": ["exp", "iat", "sub", "auth_time"]},
+        )
+        subject = claims["sub"]
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise jwt.InvalidTokenError("Token has an invalid subject.")
+        # The user must have signed in before the token was checked
+        auth_time = claims["auth_time"]
+        if not isinstance(auth_time, (int, float)) or isinstance(auth_time, bool) or auth_time > time.time():
+            raise jwt.InvalidTokenError("Token has an invalid auth_time.")
+        return claims
+
+    def _get_cached_user(self, digest: bytes) -> Optional[User]:
+        """Return the user for a recently verified token, if still fresh."""
+        cached = self._user_cache.get(digest)
+        if cached is None:
+            return None
+        user, deadline = cached
+        if time.monotonic() >= deadline:
+            del self._user_cache[digest]
+            return None
+        self._user_cache.move_to_end(digest)
+        return user
+
+    def _cache_user(self, digest: bytes, user: User, expires_at: float) -> None:
+        ttl = min(self.VERIFIED_TOKEN_TTL, expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._user_cache[digest] = (user, time.monotonic() + ttl)
+        self._user_cache.move_to_end(digest)
+        while len(self._user_cache) > self.VERIFIED_TOKEN_CACHE_SIZE:
+            self._user_cache.popitem(last=False)
+
+    async def verify_token_async(self, token: str) -> User:
+        """
+        Verifies the token, answering repeat presentations from memory.
+
+        Results are keyed by a BLAKE2b digest of the token rather than the
+        token itself; hashing it costs next to nothing next to a signature
+        check. Failures are not cached.
+        """
+        digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        user = self._get_cached_user(digest)
+        if user is not None:
+            return user
+        user, expires_at = await self._verify_uncached(token)
+        self._cache_user(digest, user, expires_at)
+        return user
+
+    async def _verify_with_sdk(self, token: str) -> Tuple[User, float]:
+        user = await asyncio.to_thread(self.verify_token, token)
+        # Signature already checked by the SDK; this only reads the expiry
+        claims = jwt.decode(token, options={"verify_signature": False})
+        return user, float(claims.get("exp", 0))
+
+    async def _verify_uncached(self, token: str) -> Tuple[User, float]:
+        """
+        Verifies the token locally with PyJWT against cached Google public keys.
+
+        Only the occasional key refresh does I/O, and it is awaited rather than
+        blocking the event loop. If the project id is unknown or the keys cannot
+        be fetched, the Admin SDK path is used instead, in a worker thread.
+        Returns the user and the token's expiry as a Unix timestamp.
+        """
+        if not self.project_id:
+            return await self._verify_with_sdk(token)
+        try:
+            keys = await self._get_public_keys()
+        except Exception:
+            logger.warning("Could not fetch Firebase signing keys; using the Admin SDK.", exc_info=True)
+            return await self._verify_with_sdk(token)
+
+        try:
+            claims = self._decode_token(token, keys)
+        except jwt.ExpiredSignatureError:
+            logger.warning("Token has expired.")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has expired.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        except jwt.InvalidTokenError as e:
+            logger.error("Invalid token or authentication error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+
+        email = claims.get('email')
+        if not email:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User email not found in token."
+            )
+        logger.debug("Token verified for user: %s", claims['sub'])
+        return User(id=claims['sub'], email=email), float(claims['exp'])
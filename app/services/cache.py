@@ -0,0 +1,38 @@
+import hashlib
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+def content_key(data: bytes) -> bytes:
+    """A short BLAKE2b digest of some content, for use as a cache key."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class LRUCache(Generic[V]):
+    """A bounded in-memory mapping that evicts the least recently used entry.
+
+    Used by the model services to memoize results for identical inputs, so a
+    re-uploaded image or repeated text skips a full model round trip. Only
+    touched from the event loop, so no locking.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
@@ -1,11 +1,10 @@
 import logging
+from collections import Counter
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
+from operator import itemgetter
 
 import numpy as np
-from sklearn.cluster import KMeans, AgglomerativeClustering
-from sklearn.preprocessing import normalize
-from sklearn.metrics import silhouette_score
 
 logger = logging.getLogger(__name__)
 
@@ -13,34 +12,159 @@ logger = logging.getLogger(__name__)
 class ClusteringService:
     """
     A service to perform clustering on image embeddings.
+
+    scikit-learn (and the SciPy stack under it) is imported on first use
+    rather than at module import: it is most of the app's import time and
+    memory, and workers that only serve uploads and listings never need it.
     """
 
-    def _select_k(self, embeddings: np.ndarray, max_k: int = 10) -> int:
-        """Heuristic to choose number of clusters via silhouette score."""
+    # Silhouette scores in the k sweep are estimated on at most this many
+    # points: the full score is O(N^2) per candidate k.
+    SILHOUETTE_SAMPLE_SIZE = 512
+    # Embeddings wider than this are PCA-projected down to it before
+    # clustering, once there are enough images for the fit to pay off.
+    PCA_COMPONENTS = 128
+    PCA_MIN_SAMPLES = 256
+    # Above this many images a fixed-k kmeans run uses MiniBatchKMeans: full
+    # Lloyd passes with ten restarts buy no measurable quality at that size.
+    MINIBATCH_MIN_SAMPLES = 5000
+
+    def __init__(self, use_sklearnex: bool = False):
+        self.use_sklearnex = use_sklearnex
+        self._sklearnex_checked = False
+
+    def _patch_sklearn(self) -> None:
+        """Swap in scikit-learn-intelex's KMeans on first use, when enabled.
+
+        The patch replaces the class in ``sklearn.cluster``, so the
+        function-level imports below pick it up without any other change.
+        """
+        if not self.use_sklearnex or self._sklearnex_checked:
+            return
+        self._sklearnex_checked = True
+        try:
+            from sklearnex import patch_sklearn
+        except ImportError:
+            logger.warning("CLUSTERING_USE_SKLEARNEX is set but scikit-learn-intelex is not installed; using stock scikit-learn.")
+            return
+        patch_sklearn(["kmeans"])
+        logger.info("Using scikit-learn-intelex KMeans.")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The sklearnex patch is per process: copies sent to sweep workers
+        # must apply it again there.
+        state = self.__dict__.copy()
+        state["_sklearnex_checked"] = False
+        return state
+
+    @staticmethod
+    def _cosine_distances(embeddings: np.ndarray) -> np.ndarray:
+        """Pairwise cosine distances of L2-normalized rows, as one GEMM.
+
+        Built in place in the product's buffer: an N x N float32 matrix.
+        """
+        distances = embeddings @ embeddings.T
+        np.subtract(1.0, distances, out=distances)
+        # Rounding can leave tiny negatives (and a non-zero diagonal)
+        np.clip(distances, 0.0, None, out=distances)
+        np.fill_diagonal(distances, 0.0)
+        return distances
+
+    def _reduce_dimensions(self, embeddings: np.ndarray) -> np.ndarray:
+        """Project normalized embeddings onto their top principal components.
+
+        Semantic clusters live in far fewer dimensions than the embedding
+        model emits, so k-means and silhouette distances over 128 components
+        find the same groups while streaming a fraction of the data. The
+        projection is re-normalized so cosine geometry still applies.
+        """
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import normalize
+
+        n_samples, dim = embeddings.shape
+        if dim <= self.PCA_COMPONENTS or n_samples <= self.PCA_MIN_SAMPLES:
+            return embeddings
+        reduced = PCA(n_components=self.PCA_COMPONENTS, random_state=42).fit_transform(embeddings)
+        return normalize(reduced, copy=False)
+
+    def _fit_and_score(
+        self, embeddings: np.ndarray, k: int, distances: Optional[np.ndarray]
+    ) -> Optional[Tuple[float, np.ndarray]]:
+        """Fits one sweep candidate; returns ``(silhouette, labels)`` or None if k is unusable."""
+        self._patch_sklearn()
+        from sklearn.cluster import KMeans
+        from sklearn.metrics import silhouette_score
+
+        n_samples = embeddings.shape[0]
+        try:
+            # One k-means++ start per candidate (scikit-learn's own default
+            # for k-means++) is enough to rank k, at a tenth of the work.
+            # copy_x stays on: workers may share the matrix as a read-only
+            # memory map, and copy_x=False would center it in place.
+            km = KMeans(n_clusters=k, init="k-means++", random_state=42, n_init=1, max_iter=100)
+            labels = km.fit_predict(embeddings)
+            # silhouette_score requires more than 1 label and fewer labels than samples
+            if len(set(labels)) <= 1 or len(set(labels)) >= n_samples:
+                return None
+            # Embeddings are L2-normalized, so cosine is the natural metric
+            score = silhouette_score(
+                embeddings if distances is None else distances,
+                labels,
+                metric="cosine" if distances is None else "precomputed",
+                sample_size=min(n_samples, self.SILHOUETTE_SAMPLE_SIZE),
+                random_state=42,
+            )
+        except Exception:
+            return None
+        return score, labels
+
+    def _select_k(
+        self, embeddings: np.ndarray, max_k: int = 10, distances: Optional[np.ndarray] = None
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """Heuristic to choose number of clusters via silhouette score.
+
+        Returns ``(k, labels)``, where ``labels`` are the KMeans labels of the
+        winning fit (None when falling back to a default k), so a kmeans
+        caller can use them instead of refitting the same model. When the
+        caller already has the cosine distance matrix, the silhouette scores
+        read from it instead of recomputing distances for every k.
+
+        Candidates are independent, so they are fitted in joblib worker
+        processes, one per core. Each worker is held to a single BLAS/OpenMP
+        thread so the pools do not oversubscribe the cores. The limit is set
+        inside the workers: BLAS thread counts are process-wide, so limiting
+        them here would also slow other requests clustering concurrently.
+        """
+        self._patch_sklearn()
+        from joblib import Parallel, delayed, effective_n_jobs, parallel_config
+
         n_samples = embeddings.shape[0]
         # At least 2 samples required for clustering
         if n_samples < 2:
-            return 1
+            return 1, None
         max_k = min(max_k, n_samples - 1)
+        candidates = range(2, max_k + 1)
+        n_jobs = min(effective_n_jobs(-1), len(candidates))
+        if n_jobs > 1:
+            with parallel_config(backend="loky", inner_max_num_threads=1):
+                results = Parallel(n_jobs=n_jobs)(
+                    delayed(self._fit_and_score)(embeddings, k, distances) for k in candidates
+                )
+        else:
+            results = [self._fit_and_score(embeddings, k, distances) for k in candidates]
+
         best_k = None
+        best_labels = None
         best_score = -1.0
-        for k in range(2, max_k + 1):
-            try:
-                km = KMeans(n_clusters=k, random_state=42, n_init=10)
-                labels = km.fit_predict(embeddings)
-                # silhouette_score requires more than 1 label and fewer labels than samples
-                if len(set(labels)) <= 1 or len(set(labels)) >= n_samples:
-                    continue
-                score = silhouette_score(embeddings, labels)
-                if score > best_score:
-                    best_score = score
-                    best_k = k
-            except Exception:
-                continue
+        # Scan in k order so ties still go to the smallest k
+        for k, result in zip(candidates, results):
+            if result is not None and result[0] > best_score:
+                best_score, best_labels = result
+                best_k = k
         # Fallbacks
         if best_k is None:
-            return min(3, n_samples)  # default sensible value
-        return best_k
+            return min(3, n_samples), None  # default sensible value
+        return best_k, best_labels
 
     def _cluster(
         self,
@@ -68,48 +192,87 @@ class ClusteringService:
             )
             return {}, image_ids
 
+        self._patch_sklearn()
+        from sklearn.cluster import KMeans, MiniBatchKMeans, AgglomerativeClustering
+        from sklearn.preprocessing import normalize
+
         # Normalize embeddings for better performance with distance-based algorithms
-        embeddings = normalize(embeddings)
+        # (in place: the caller's float32 matrix is ours to modify)
+        embeddings = normalize(embeddings, copy=False)
+        # Worth it wherever k-means runs; a single hierarchical fit on one
+        # distance GEMM is already faster than fitting the PCA
+        if algorithm == "kmeans":
+            embeddings = self._reduce_dimensions(embeddings)
+
+        # Hierarchical clustering needs every pairwise distance anyway, so
+        # compute them once and share them with the silhouette sweep
+        distances = self._cosine_distances(embeddings) if algorithm == "hierarchical" else None
 
         # If n_clusters is None, choose automatically
+        sweep_labels = None
         if n_clusters is None:
-            # limit search to a reasonable number to avoid long compute
-            chosen_k = self._select_k(embeddings, max_k=10)
-            logger.info(f"Auto-selected n_clusters={chosen_k} via silhouette heuristic.")
+            # limit search to a reasonable number to avoid long compute.
+            # The sweep's k-means fits run on the projection; a hierarchical
+            # fit keeps its full-dimensional distances.
+            sweep_input = embeddings if algorithm == "kmeans" else self._reduce_dimensions(embeddings)
+            chosen_k, sweep_labels = self._select_k(sweep_input, max_k=10, distances=distances)
+            logger.info("Auto-selected n_clusters=%d via silhouette heuristic.", chosen_k)
             n_clusters = chosen_k
 
         model = None
         if algorithm == "kmeans":
             if embeddings.shape[0] < n_clusters:
                 logger.warning(
-                    f"Number of images ({embeddings.shape[0]}) is less than n_clusters ({n_clusters}). Adjusting n_clusters."
+                    "Number of images (%d) is less than n_clusters (%d). Adjusting n_clusters.",
+                    embeddings.shape[0], n_clusters,
                 )
                 n_clusters = embeddings.shape[0]
-            model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+            if embeddings.shape[0] > self.MINIBATCH_MIN_SAMPLES:
+                model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=1024, n_init=3, random_state=42)
+            else:
+                model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10, copy_x=False)
 
         elif algorithm == "hierarchical":
             if embeddings.shape[0] < n_clusters:
                 logger.warning(
-                    f"Number of images ({embeddings.shape[0]}) is less than n_clusters ({n_clusters}). Adjusting n_clusters."
+                    "Number of images (%d) is less than n_clusters (%d). Adjusting n_clusters.",
+                    embeddings.shape[0], n_clusters,
                 )
                 n_clusters = embeddings.shape[0]
-            model = AgglomerativeClustering(n_clusters=n_clusters)
+            # Average linkage on cosine distance; ward would need raw features
+            model = AgglomerativeClustering(n_clusters=n_clusters, metric="precomputed", linkage="average")
 
         else:
             raise ValueError(f"Unknown clustering algorithm: {algorithm}")
 
-        logger.info(f"Running {algorithm} clustering on {len(image_ids)} images with k={n_clusters}...")
-        labels = model.fit_predict(embeddings)
-        logger.info(f"Clustering complete. Found labels: {np.unique(labels)}")
+        if algorithm == "kmeans" and sweep_labels is not None:
+            # The sweep already fit a seeded k-means++ model with this k
+            logger.info("Reusing k=%d kmeans labels from the silhouette sweep.", n_clusters)
+            labels = sweep_labels
+        else:
+            logger.info("Running %s clustering on %d images with k=%d...", algorithm, len(image_ids), n_clusters)
+            labels = model.fit_predict(embeddings if distances is None else distances)
+        if logger.isEnabledFor(logging.INFO):
+            # np.unique sorts a copy of the labels; skip it when INFO is off
+            logger.info("Clustering complete. Found labels: %s", np.unique(labels))
+
+        # Group ids by label with one stable sort instead of a dict probe per
+        # image. Members keep their input order, and clusters are emitted in
+        # order of first appearance, as the per-image loop produced them.
+        labels = np.asarray(labels)
+        order = np.argsort(labels, kind="stable")
+        sorted_ids = np.asarray(image_ids, dtype=object)[order]
+        unique_labels, starts = np.unique(labels[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
 
         clusters: Dict[int, List[str]] = {}
         noise_points: List[str] = []
-
-        for image_id, label in zip(image_ids, labels):
-            if label == -1:  # DBSCAN noise points are labeled -1 (not used here but kept)
-                noise_points.append(image_id)
+        for g in np.argsort(order[starts], kind="stable"):
+            members = sorted_ids[starts[g]:ends[g]].tolist()
+            if unique_labels[g] == -1:  # DBSCAN noise points are labeled -1 (not used here but kept)
+                noise_points = members
             else:
-                clusters.setdefault(int(label), []).append(image_id)
+                clusters[int(unique_labels[g])] = members
 
         return clusters, noise_points
 
@@ -127,7 +290,233 @@ class ClusteringService:
             logger.warning("No images with embeddings found for clustering.")
             return {}, [r["image_id"] for r in image_records]
 
+        # Records embedded before AZURE_OPENAI_EMBEDDING_DIMENSIONS changed
+        # have another width; cluster the most common one and leave the rest
+        # unclustered until they are re-embedded.
+        dim, mismatched = _dominant_width([record["embedding"] for record in records_with_embeddings])
+        if mismatched:
+            logger.warning("Leaving %d images with embeddings not %d wide out of clustering.", mismatched, dim)
+            skipped = [r["image_id"] for r in records_with_embeddings if len(r["embedding"]) != dim]
+            records_with_embeddings = [r for r in records_with_embeddings if len(r["embedding"]) == dim]
+        else:
+            skipped = []
+
         image_ids = [record["image_id"] for record in records_with_embeddings]
-        embeddings = np.array([record["embedding"] for record in records_with_embeddings])
+        # float32, C-ordered: half the bytes of NumPy's float64 default for
+        # every distance computation in KMeans and the silhouette sweep. Rows
+        # are filled into a preallocated matrix, so no list of lists or
+        # full-size float64 intermediate is built on the way.
+        embeddings = np.empty((len(records_with_embeddings), dim), dtype=np.float32)
+        for row, record in zip(embeddings, records_with_embeddings):
+            row[:] = record["embedding"]
+
+        clusters, unclustered = self._cluster(embeddings, image_ids, algorithm, n_clusters)
+        return clusters, unclustered + skipped
+
 
-        return self._cluster(embeddings, image_ids, algorithm, n_clusters)
+def _dominant_width(embeddings: List[List[float]]) -> Tuple[int, int]:
+    """Return the most common embedding width and how many embeddings differ from it."""
+    widths = Counter(len(embedding) for embedding in embeddings)
+    dim, count = widths.most_common(1)[0]
+    return dim, len(embeddings) - count
+
+
+def _as_float32(values) -> np.ndarray:
+    """Convert (nested) lists of Python floats to a float32 array.
+
+    Converting Python floats straight to float32 takes NumPy's slow
+    per-element casting path (about 5x slower than float64 here), so
+    build float64 and cast the finished block instead.
+    """
+    return np.asarray(values, dtype=np.float64).astype(np.float32)
+
+
+class UserEmbeddingStore:
+    """
+    A user's clustered embeddings as one contiguous float32 matrix.
+
+    Rows are unit-normalized embeddings with parallel ``image_ids`` and
+    ``cluster_ids``. The store is built once per upload request from the
+    user's records (converting the Python lists a single time) and then
+    grown in place as new images are assigned, so auto-assignment never
+    re-converts the whole partition. Capacity grows geometrically, making
+    appends amortized O(D).
+
+    Cluster statistics are computed once and cached; an append only
+    recomputes the cluster it lands in, so assigning K files costs one full
+    pass plus K single-cluster updates.
+    """
+
+    def __init__(self):
+        self._matrix: Optional[np.ndarray] = None  # (capacity, D); first _size rows are live
+        self._cluster_ids = np.empty(0, dtype=np.int32)
+        self._size = 0
+        self.image_ids: List[str] = []
+        # Highest cluster id seen, including records without an embedding
+        self.max_cluster_id: Optional[int] = None
+        # Cached result of cluster_stats(), kept current by append()
+        self._stats: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], dim: Optional[int] = None) -> "UserEmbeddingStore":
+        """Build the store from a user's records.
+
+        Only embeddings ``dim`` wide (by default the most common width) are
+        kept: records embedded before AZURE_OPENAI_EMBEDDING_DIMENSIONS
+        changed cannot be compared with new ones.
+        """
+        store = cls()
+        cids = [int(rec["cluster_id"]) for rec in records if rec.get("cluster_id") is not None]
+        store.max_cluster_id = max(cids) if cids else None
+
+        # Sort before stacking so the matrix starts out in cluster order
+        members = sorted(
+            (
+                (int(rec["cluster_id"]), rec["image_id"], rec["embedding"])
+                for rec in records
+                if rec.get("cluster_id") is not None and rec.get("embedding")
+            ),
+            key=itemgetter(0),
+        )
+        if not members:
+            return store
+        if dim is None:
+            dim, mismatched = _dominant_width([vec for _, _, vec in members])
+        else:
+            mismatched = sum(len(vec) != dim for _, _, vec in members)
+        if mismatched:
+            logger.warning("Ignoring %d clustered embeddings that are not %d wide.", mismatched, dim)
+            members = [member for member in members if len(member[2]) == dim]
+            if not members:
+                return store
+
+        matrix = np.ascontiguousarray(_as_float32([vec for _, _, vec in members]))
+        cluster_ids = np.fromiter((cid for cid, _, _ in members), dtype=np.int32, count=len(members))
+        image_ids = [image_id for _, image_id, _ in members]
+
+        # Normalize rows in place; filter zero and non-finite rows (copying only
+        # if there are any). einsum computes the squared row norms without
+        # np.linalg.norm's X*X temporary, and the checks run on those N values.
+        sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+        mask = np.isfinite(sq_norms) & (sq_norms > 0)
+        if not mask.all():
+            matrix, cluster_ids, sq_norms = matrix[mask], cluster_ids[mask], sq_norms[mask]
+            image_ids = [image_id for image_id, keep in zip(image_ids, mask.tolist()) if keep]
+        matrix *= (1.0 / np.sqrt(sq_norms))[:, None]
+
+        store._matrix, store._cluster_ids, store._size = matrix, cluster_ids, len(image_ids)
+        store.image_ids = image_ids
+        return store
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, image_id: str, cluster_id: Optional[int], embedding: List[float]) -> None:
+        """Add a newly assigned image; unclustered or zero vectors only bump ``max_cluster_id``."""
+        if cluster_id is None:
+            return
+        cluster_id = int(cluster_id)
+        if self.max_cluster_id is None or cluster_id > self.max_cluster_id:
+            self.max_cluster_id = cluster_id
+        if not embedding:
+            return
+        v = _as_float32(embedding)
+        sq_norm = v @ v
+        if not (np.isfinite(sq_norm) and sq_norm > 0):
+            return
+        if self._matrix is None:
+            self._matrix = np.empty((0, v.size), dtype=np.float32)
+        elif v.size != self._matrix.shape[1]:
+            logger.warning("Embedding for %s has dimension %d, expected %d; not stored.", image_id, v.size, self._matrix.shape[1])
+            return
+
+        if self._size == self._matrix.shape[0]:
+            capacity = max(8, 2 * self._size)
+            matrix = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+            matrix[: self._size] = self._matrix[: self._size]
+            cluster_ids = np.empty(capacity, dtype=np.int32)
+            cluster_ids[: self._size] = self._cluster_ids[: self._size]
+            self._matrix, self._cluster_ids = matrix, cluster_ids
+
+        self._matrix[self._size] = v * (1.0 / np.sqrt(sq_norm))
+        self._cluster_ids[self._size] = cluster_id
+        self.image_ids.append(image_id)
+        self._size += 1
+        if self._stats is not None:
+            self._update_cluster_stats(cluster_id)
+
+    def cluster_stats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Compute per-cluster centroids and cohesion for auto-assignment.
+
+        Returns parallel arrays ``(cluster_ids, centroids, sizes, mean_sims,
+        std_sims)``: unit-norm centroids and, per cluster, the member count and
+        the mean/std cosine similarity of members to their centroid. Clusters
+        whose centroid cancels out are left out.
+        """
+        if self._stats is None:
+            self._stats = self._compute_cluster_stats()
+        return self._stats
+
+    def _compute_cluster_stats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if self._size == 0:
+            empty = np.empty(0)
+            return empty.astype(int), np.empty((0, 0), dtype=np.float32), empty.astype(int), empty, empty
+
+        X = self._matrix[: self._size]
+        cids = self._cluster_ids[: self._size]
+        # Per-cluster work below runs on contiguous row slices; appended or
+        # reassigned rows can break the cluster order, so restore it if needed.
+        if np.any(cids[1:] < cids[:-1]):
+            order = np.argsort(cids, kind="stable")
+            X, cids = X[order], cids[order]
+
+        cluster_ids, starts, sizes = np.unique(cids, return_index=True, return_counts=True)
+
+        # One pass per cluster: sum its contiguous rows (much faster than
+        # np.add.reduceat along axis 0, which reduces element by element), then
+        # score the same rows against the centroid while they are still in
+        # cache, instead of a second sweep over the whole matrix.
+        centroids = np.empty((cluster_ids.size, X.shape[1]), dtype=np.float32)
+        valid = np.empty(cluster_ids.size, dtype=bool)
+        sims_per_cluster = []
+        for i, (s, e) in enumerate(zip(starts.tolist(), (starts + sizes).tolist())):
+            block = X[s:e]
+            centroid = block.sum(axis=0)
+            c_sq_norm = centroid @ centroid
+            valid[i] = c_sq_norm > 0
+            if valid[i]:
+                centroid *= 1.0 / np.sqrt(c_sq_norm)
+            centroids[i] = centroid
+            sims_per_cluster.append(block @ centroid)
+
+        # Each member's similarity to its own centroid, aggregated per cluster
+        # (in float64: the variance below is a difference of close values)
+        member_sims = np.concatenate(sims_per_cluster).astype(np.float64)
+        means = np.add.reduceat(member_sims, starts) / sizes
+        stds = np.sqrt(np.maximum(np.add.reduceat(member_sims * member_sims, starts) / sizes - means * means, 0.0))
+
+        return cluster_ids[valid], centroids[valid], sizes[valid], means[valid], stds[valid]
+
+    def _update_cluster_stats(self, cluster_id: int) -> None:
+        """Recompute the cached statistics of one cluster after it changed."""
+        members = self._matrix[: self._size][self._cluster_ids[: self._size] == cluster_id]
+        centroid = members.sum(axis=0)
+        c_sq_norm = centroid @ centroid
+
+        cluster_ids, centroids, sizes, means, stds = self._stats
+        if centroids.shape[1] != members.shape[1]:
+            centroids = np.empty((0, members.shape[1]), dtype=np.float32)
+        pos = int(np.searchsorted(cluster_ids, cluster_id))
+        if pos < cluster_ids.size and cluster_ids[pos] == cluster_id:
+            cluster_ids, centroids, sizes, means, stds = (
+                np.delete(a, pos, axis=0) for a in (cluster_ids, centroids, sizes, means, stds)
+            )
+        if c_sq_norm > 0:
+            centroid *= 1.0 / np.sqrt(c_sq_norm)
+            member_sims = (members @ centroid).astype(np.float64)
+            cluster_ids = np.insert(cluster_ids, pos, cluster_id)
+            centroids = np.insert(centroids, pos, centroid, axis=0)
+            sizes = np.insert(sizes, pos, len(members))
+            means = np.insert(means, pos, member_sims.mean())
+            stds = np.insert(stds, pos, member_sims.std())
+        self._stats = (cluster_ids, centroids, sizes, means, stds)
@@ -1,16 +1,69 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Sequence, Union
-from aiobotocore.session import get_session
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 from decimal import Decimal
 
+import numpy as np
+
 from app.core.config import Settings
+from app.services.clients import AWS_RETRIES, get_aws_session
 
 logger = logging.getLogger(__name__)
 
 
 Number = Union[int, float, Decimal]
 
+def _serialize_list(value: List[Any]) -> Dict[str, Any]:
+    """Numeric lists become an 'L' of 'N'; anything else is stringified."""
+    if all(isinstance(x, (int, float, Decimal)) for x in value):
+        return {"L": [{"N": str(n)} for n in value]}
+    return {"S": str(value)}
+
+# Exact-type lookup for _serialize_value, so most attributes cost one dict
+# hit instead of a chain of isinstance checks. Keying on type(v) also keeps
+# bool apart from int. Subclasses and unknown types fall through to the checks.
+_SERIALIZERS = {
+    bool: lambda v: {"BOOL": v},
+    type(None): lambda v: {"NULL": True},
+    int: lambda v: {"N": str(v)},
+    float: lambda v: {"N": str(v)},
+    Decimal: lambda v: {"N": str(v)},
+    str: lambda v: {"S": v},
+    list: _serialize_list,
+    np.ndarray: lambda v: _serialize_list(v.tolist()),
+}
+
+
+def _deserialize_number(token: str) -> Union[int, float]:
+    """Convert a DynamoDB 'N' token to int when it is integral, else float.
+
+    Decides by looking at the token instead of letting int() raise, which
+    made every float in a legacy list embedding pay for an exception.
+    float() rounds decimal strings correctly, so no Decimal detour is needed.
+    """
+    if "." in token or "e" in token or "E" in token:
+        return float(token)
+    return int(token)
+
+
+# Wire type -> decoder for _deserialize_item. 'L' is assumed to hold numbers
+# (embeddings); 'B' stays raw bytes until _decode_embedding looks at it.
+_DESERIALIZERS = {
+    "S": lambda v: v,
+    "N": _deserialize_number,
+    "L": lambda v: [_deserialize_number(n["N"]) for n in v],
+    "B": lambda v: v,
+    "BOOL": lambda v: v,
+    "NULL": lambda v: None,
+}
+
 
 class DynamoDBService:
     """Small wrapper around an aiobotocore DynamoDB client.
@@ -20,17 +73,49 @@ class DynamoDBService:
     intent is easier to read.
     """
 
+    # Max UpdateItem calls in flight during a bulk update. All items share the
+    # user's partition key, so unbounded fan-out would only get throttled.
+    BULK_UPDATE_CONCURRENCY = 32
+    # DynamoDB answers in milliseconds, so a stalled connection is better
+    # abandoned and retried than waited on for botocore's 60s default
+    CONNECT_TIMEOUT = 2
+    READ_TIMEOUT = 10
+    # get_user_images results are served from memory while younger than
+    # TTL, so another worker's writes show up within that; past half of it,
+    # a read also starts a background refresh. Entries hold full records
+    # (embeddings included), hence the small LRU bound.
+    USER_IMAGES_TTL = 60
+    USER_IMAGES_CACHE_SIZE = 64
+    # BatchWriteItem accepts at most 25 puts; unprocessed ones are retried
+    # with exponential backoff from BATCH_WRITE_BACKOFF seconds.
+    BATCH_WRITE_SIZE = 25
+    BATCH_WRITE_MAX_ATTEMPTS = 6
+    BATCH_WRITE_BACKOFF = 0.05
+    # How long a batch_writer() waits for more records before sending a
+    # batch that is not full
+    BATCH_WRITE_FLUSH_INTERVAL = 0.02
+    # Query pages with more items than this are decoded on a worker thread,
+    # overlapping the next page's fetch and keeping the event loop free
+    DESERIALIZE_IN_THREAD_MIN_ITEMS = 32
+
     def __init__(self, settings: Settings):
         self.settings = settings
         # aiobotocore session used to create async clients
-        self.session = get_session()
-
-    async def _get_client(self):
-        """Create and return an async DynamoDB client.
-
-        The method returns a client instance that can be used in an
-        async context manager (``async with client as dynamodb``).
-        """
+        self.session = get_aws_session()
+        # One long-lived client for all calls (see _get_client)
+        self._client = None
+        self._client_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
+        # user_id -> (items, monotonic fetch time), kept in LRU order
+        self._user_images: "OrderedDict[str, Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        # user_id -> the one in-flight query for that user's images
+        self._user_images_queries: Dict[str, asyncio.Task] = {}
+        # Strong references to every such query until it finishes: background
+        # refreshes have no awaiter, and invalidation drops the dict entry.
+        self._user_images_tasks: Set[asyncio.Task] = set()
+
+    def _create_client(self):
+        """Create an async DynamoDB client (to be entered as a context manager)."""
         client_kwargs = {
             "region_name": self.settings.AWS_DEFAULT_REGION or self.settings.S3_REGION,
             "aws_access_key_id": self.settings.AWS_ACCESS_KEY_ID,
@@ -38,16 +123,44 @@ class DynamoDBService:
         }
         if self.settings.AWS_SESSION_TOKEN:
             client_kwargs["aws_session_token"] = self.settings.AWS_SESSION_TOKEN
+        client_kwargs["config"] = BotoConfig(
+            max_pool_connections=self.settings.AWS_MAX_POOL_CONNECTIONS,
+            # Keep idle pooled connections alive between bursts of requests
+            tcp_keepalive=True,
+            connect_timeout=self.CONNECT_TIMEOUT,
+            read_timeout=self.READ_TIMEOUT,
+            retries=AWS_RETRIES,
+        )
         return self.session.create_client("dynamodb", **client_kwargs)
 
-    # ---- Serialization helpers -------------------------------------------------
-    def _is_numeric_sequence(self, value: Sequence[Any]) -> bool:
-        """Return True when value is a sequence of numbers (int/float/Decimal).
+    async def _get_client(self):
+        """Return the shared DynamoDB client, creating it on first use.
 
-        Used to detect embedding vectors which we store as DynamoDB 'L' of 'N'.
+        Entering a client builds its HTTP session, endpoint resolver and
+        signer, and its first request pays a TCP/TLS handshake; one client
+        per service keeps those warm across requests instead of paying for
+        them on every call.
         """
-        return all(isinstance(x, (int, float, Decimal)) for x in value)
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    stack = AsyncExitStack()
+                    self._client = await stack.enter_async_context(self._create_client())
+                    self._client_stack = stack
+        return self._client
+
+    async def warm_up(self) -> None:
+        """Create the shared client now instead of on the first request."""
+        await self._get_client()
+
+    async def close(self) -> None:
+        """Close the shared client, if it was created."""
+        if self._client_stack is not None:
+            await self._client_stack.aclose()
+            self._client = None
+            self._client_stack = None
 
+    # ---- Serialization helpers -------------------------------------------------
     def _serialize_value(self, value: Any) -> Dict[str, Any]:
         """Serialize a single Python value into the DynamoDB wire format.
 
@@ -56,6 +169,9 @@ class DynamoDBService:
         the caller), booleans 'BOOL', and None becomes 'NULL'. Fallbacks
         to string for unknown types.
         """
+        serialize = _SERIALIZERS.get(type(value))
+        if serialize is not None:
+            return serialize(value)
         if isinstance(value, bool):
             return {"BOOL": value}
         if value is None:
@@ -64,8 +180,8 @@ class DynamoDBService:
             return {"N": str(value)}
         if isinstance(value, str):
             return {"S": value}
-        if isinstance(value, list) and self._is_numeric_sequence(value):
-            return {"L": [{"N": str(n)} for n in value]}
+        if isinstance(value, list):
+            return _serialize_list(value)
         # Default fallback: stringify unknown types
         return {"S": str(value)}
 
@@ -76,48 +192,113 @@ class DynamoDBService:
         empty string attributes.
         """
         item: Dict[str, Any] = {}
+        serializers = _SERIALIZERS
         for key, value in record.items():
             # Skip empty strings explicitly
             if isinstance(value, str) and value == "":
                 continue
-            item[key] = self._serialize_value(value)
+            if key == "embedding" and isinstance(value, (list, np.ndarray)):
+                item.update(self._encode_embedding(value))
+                continue
+            serialize = serializers.get(type(value))
+            item[key] = serialize(value) if serialize is not None else self._serialize_value(value)
         return item
 
-    # ---- Deserialization helpers ----------------------------------------------
-    def _deserialize_number(self, token: str) -> Union[int, float]:
-        """Convert a DynamoDB 'N' token to int when possible, else float.
+    def _encode_embedding(self, embedding: Union[List[float], np.ndarray]) -> Dict[str, Any]:
+        """Encode an embedding in the configured EMBEDDING_STORAGE format.
+
+        - 'float32': a Binary attribute of 4*D little-endian bytes, exactly
+          the precision stored vectors carry (vs ~15 bytes per component as
+          decimal strings).
+        - 'float16': 2*D bytes; about 3 significant digits per component,
+          plenty for cosine similarity between unit-length vectors.
+        - 'int8': D bytes plus an ``embedding_scale`` of ``max|x| / 127``;
+          rounding error is at most half a step per component, well below
+          what changes a cosine-similarity ranking.
+        - 'list': a list of numbers, the original format.
 
-        Uses Decimal to avoid floating point surprises when parsing.
+        Binary formats also write ``embedding_dtype`` so reads can tell them
+        apart; see _decode_embedding.
+
+        A NumPy array is accepted as is, so callers holding one need not
+        build a list first; for the binary formats it is never converted.
         """
-        try:
-            return int(token)
-        except ValueError:
-            return float(Decimal(token))
+        storage = self.settings.EMBEDDING_STORAGE
+        if len(embedding) == 0 or storage == "list":
+            if isinstance(embedding, np.ndarray):
+                embedding = embedding.tolist()
+            # Our own float vectors: skip the per-element type checks
+            return {"embedding": {"L": [{"N": token} for token in map(str, embedding)]}}
+        if storage == "int8":
+            v = np.asarray(embedding, dtype=np.float64)
+            max_abs = float(np.abs(v).max())
+            scale = max_abs / 127 if max_abs > 0 else 1.0
+            return {
+                "embedding": {"B": np.round(v / scale).astype(np.int8).tobytes()},
+                "embedding_dtype": {"S": "int8"},
+                "embedding_scale": {"N": repr(scale)},
+            }
+        if storage == "float16":
+            return {
+                "embedding": {"B": np.asarray(embedding, dtype="<f2").tobytes()},
+                "embedding_dtype": {"S": "float16"},
+            }
+        if isinstance(embedding, list) and sys.byteorder == "little":
+            # The common case, a list straight from the model: array() packs it
+            # to C floats directly, skipping NumPy's conversion (~30 vs ~42 us
+            # at 1536 dims)
+            data = array("f", embedding).tobytes()
+        else:
+            data = np.asarray(embedding, dtype="<f4").tobytes()
+        return {
+            "embedding": {"B": data},
+            "embedding_dtype": {"S": "float32"},
+        }
 
+    def _decode_embedding(self, out: Dict[str, Any]) -> None:
+        """Turn a binary ``embedding`` in a deserialized item back into floats.
+
+        Every storage format reads back as a plain list of floats, so records
+        written before or after a format change look the same to callers.
+        """
+        data = out.get("embedding")
+        if not isinstance(data, bytes):
+            return
+        scale = out.pop("embedding_scale", None)
+        dtype = out.pop("embedding_dtype", "int8" if scale is not None else "float32")
+        if dtype == "int8":
+            out["embedding"] = (np.frombuffer(data, dtype=np.int8).astype(np.float64) * scale).tolist()
+        elif dtype == "float16":
+            out["embedding"] = np.frombuffer(data, dtype="<f2").tolist()
+        else:
+            out["embedding"] = np.frombuffer(data, dtype="<f4").tolist()
+
+    # ---- Deserialization helpers ----------------------------------------------
     def _deserialize_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Convert a DynamoDB Item into a plain Python dict.
 
         Assumes lists stored as L are lists of numbers (stored as N).
         """
         out: Dict[str, Any] = {}
+        deserializers = _DESERIALIZERS
         for key, typed in item.items():
-            # typed is a dict like {'S': 'value'} or {'N': '123'}
-            type_key = next(iter(typed))
-            val = typed[type_key]
-
-            if type_key == "S":
-                out[key] = val
-            elif type_key == "N":
-                out[key] = self._deserialize_number(val)
-            elif type_key == "L":
-                # Expect a list of {'N': '...'} nodes for embeddings
-                out[key] = [self._deserialize_number(n["N"]) for n in val]
-            elif type_key == "BOOL":
-                out[key] = val
-            elif type_key == "NULL":
-                out[key] = None
+            # typed is a single-entry dict like {'S': 'value'} or {'N': '123'}.
+            # Most attributes are strings, so test for those before dispatching;
+            # this beats a table lookup on every attribute (~2.9 vs ~4.3 us/item).
+            if "S" in typed:
+                out[key] = typed["S"]
+                continue
+            for type_key, val in typed.items():
+                decode = deserializers.get(type_key)
+                # Attribute types we never write (sets, maps) are skipped, as before
+                if decode is not None:
+                    out[key] = decode(val)
+        self._decode_embedding(out)
         return out
 
+    def _deserialize_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self._deserialize_item(i) for i in items]
+
     # ---- Public methods -------------------------------------------------------
     async def add_image_record(self, record: Dict[str, Any]) -> None:
         """Add a single image record to the configured DynamoDB table.
@@ -127,10 +308,11 @@ class DynamoDBService:
         behaviour).
         """
         try:
-            client = await self._get_client()
+            dynamodb = await self._get_client()
             item = self._serialize_item(record)
-            async with client as dynamodb:
-                await dynamodb.put_item(TableName=self.settings.DYNAMODB_TABLE_NAME, Item=item)
+            await dynamodb.put_item(TableName=self.settings.DYNAMODB_TABLE_NAME, Item=item)
+
+            self._invalidate_user_images(record.get("user_id"))
 
             logger.info(
                 "Added image record for user %s, image_id %s",
@@ -141,6 +323,67 @@ class DynamoDBService:
             logger.exception("Failed to add image record")
             raise
 
+    async def _put_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write up to BATCH_WRITE_SIZE records with one BatchWriteItem call.
+
+        Items DynamoDB reports as unprocessed (throttling) are resubmitted
+        with exponential backoff. Returns the records still unwritten after
+        BATCH_WRITE_MAX_ATTEMPTS; a failed request raises ClientError.
+        """
+        table = self.settings.DYNAMODB_TABLE_NAME
+        by_key = {(r.get("user_id"), r.get("image_id")): r for r in records}
+        requests = [{"PutRequest": {"Item": self._serialize_item(r)}} for r in records]
+        try:
+            dynamodb = await self._get_client()
+            for attempt in range(self.BATCH_WRITE_MAX_ATTEMPTS):
+                if attempt:
+                    await asyncio.sleep(self.BATCH_WRITE_BACKOFF * 2 ** (attempt - 1))
+                response = await dynamodb.batch_write_item(RequestItems={table: requests})
+                requests = response.get("UnprocessedItems", {}).get(table, [])
+                if not requests:
+                    break
+        except ClientError:
+            logger.exception("Failed to batch write image records")
+            raise
+        finally:
+            for user_id in {r.get("user_id") for r in records}:
+                self._invalidate_user_images(user_id)
+
+        unprocessed = []
+        for request in requests:
+            item = request["PutRequest"]["Item"]
+            unprocessed.append(by_key[(item["user_id"]["S"], item["image_id"]["S"])])
+        logger.info("Batch wrote %d of %d image records", len(records) - len(unprocessed), len(records))
+        return unprocessed
+
+    async def add_image_records(self, records: List[Dict[str, Any]]) -> None:
+        """Add many image records using BatchWriteItem, 25 per request.
+
+        Requests run concurrently (bounded like bulk updates). Raises
+        RuntimeError if some records are still unprocessed after retries,
+        or ClientError if a request fails outright.
+        """
+        slots = asyncio.Semaphore(self.BULK_UPDATE_CONCURRENCY)
+        size = self.BATCH_WRITE_SIZE
+
+        async def _write_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            async with slots:
+                return await self._put_batch(chunk)
+
+        results = await asyncio.gather(
+            *(_write_chunk(records[i:i + size]) for i in range(0, len(records), size))
+        )
+        unprocessed = sum(len(r) for r in results)
+        if unprocessed:
+            raise RuntimeError(f"{unprocessed} of {len(records)} image records were not written")
+
+    def batch_writer(self) -> "BatchWriter":
+        """Return a context manager that coalesces add_image_record-style puts.
+
+        Usage: ``async with db.batch_writer() as writer: await writer.put(record)``.
+        """
+        return BatchWriter(self, self.BATCH_WRITE_FLUSH_INTERVAL)
+
     async def get_image_record(self, user_id: str, image_id: str) -> Optional[Dict[str, Any]]:
         """Fetch a single image record by (user_id, image_id).
 
@@ -148,12 +391,11 @@ class DynamoDBService:
         the method logs and returns None (same as before).
         """
         try:
-            client = await self._get_client()
-            async with client as dynamodb:
-                response = await dynamodb.get_item(
-                    TableName=self.settings.DYNAMODB_TABLE_NAME,
-                    Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
-                )
+            dynamodb = await self._get_client()
+            response = await dynamodb.get_item(
+                TableName=self.settings.DYNAMODB_TABLE_NAME,
+                Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
+            )
 
             logger.debug("Fetched image record for user %s, image_id %s", user_id, image_id)
             item = response.get("Item")
@@ -162,26 +404,98 @@ class DynamoDBService:
             logger.exception("Failed to fetch image record")
             return None
 
-    async def get_user_images(self, user_id: str) -> List[Dict[str, Any]]:
-        """Query all images for a specific user_id and return deserialized items.
+    async def get_user_images(self, user_id: str, fresh: bool = False) -> List[Dict[str, Any]]:
+        """Return all images for a specific user_id as deserialized items.
+
+        Served stale-while-revalidate from a per-process cache (see the
+        USER_IMAGES_* settings). Writes made through this service drop the
+        user's entry; writes from other processes show up once it ages out.
+        ``fresh=True`` skips the cache and waits for a query (joining one
+        already in flight), for callers that go on to write based on the
+        result. Callers get their own list but share the record dicts, which
+        must be treated as read-only.
 
         On error returns an empty list (preserves previous behavior).
         """
+        cached = None if fresh else self._user_images.get(user_id)
+        if cached is not None:
+            items, fetched_at = cached
+            age = time.monotonic() - fetched_at
+            if age < self.USER_IMAGES_TTL:
+                self._user_images.move_to_end(user_id)
+                if age >= self.USER_IMAGES_TTL / 2:
+                    self._query_user_images(user_id)
+                return list(items)
+        # shield: a cancelled caller must not cancel the query others share
+        items = await asyncio.shield(self._query_user_images(user_id))
+        return [] if items is None else list(items)
+
+    def _query_user_images(self, user_id: str) -> asyncio.Task:
+        """Start, or join, the single in-flight query for a user's images."""
+        task = self._user_images_queries.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_user_images(user_id))
+            self._user_images_queries[user_id] = task
+            self._user_images_tasks.add(task)
+            task.add_done_callback(self._user_images_query_done)
+        return task
+
+    def _user_images_query_done(self, task: asyncio.Task) -> None:
+        """Release a finished query, logging errors a refresh would otherwise lose."""
+        self._user_images_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("User images query failed", exc_info=task.exception())
+
+    async def _fetch_user_images(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Query the user's images and cache them, unless a write intervened.
+
+        Follows every page of the query (each Query response stops at 1 MB).
+        Pages are fetched one after another, since each needs the previous
+        LastEvaluatedKey, but large pages are decoded in the background
+        while the next one is fetched.
+
+        Returns None (after logging) on ClientError.
+        """
         try:
-            client = await self._get_client()
-            async with client as dynamodb:
-                response = await dynamodb.query(
-                    TableName=self.settings.DYNAMODB_TABLE_NAME,
-                    KeyConditionExpression="user_id = :uid",
-                    ExpressionAttributeValues={":uid": {"S": user_id}},
-                )
-
-            logger.debug("Fetched images for user %s", user_id)
-            items = response.get("Items", [])
-            return [self._deserialize_item(i) for i in items]
+            dynamodb = await self._get_client()
+            paginator = dynamodb.get_paginator("query")
+            pages: List[Any] = []
+            async for page in paginator.paginate(
+                TableName=self.settings.DYNAMODB_TABLE_NAME,
+                KeyConditionExpression="user_id = :uid",
+                ExpressionAttributeValues={":uid": {"S": user_id}},
+            ):
+                page_items = page.get("Items", [])
+                if len(page_items) > self.DESERIALIZE_IN_THREAD_MIN_ITEMS:
+                    pages.append(asyncio.create_task(asyncio.to_thread(self._deserialize_items, page_items)))
+                else:
+                    pages.append(self._deserialize_items(page_items))
+            logger.debug("Fetched %d pages of images for user %s", len(pages), user_id)
+            items = [
+                item
+                for page in pages
+                for item in (await page if isinstance(page, asyncio.Task) else page)
+            ]
         except ClientError:
             logger.exception("Failed to fetch user images")
-            return []
+            return None
+        finally:
+            # A write for this user while the query ran unregisters it
+            current = self._user_images_queries.get(user_id) is asyncio.current_task()
+            if current:
+                del self._user_images_queries[user_id]
+
+        if current:
+            self._user_images[user_id] = (items, time.monotonic())
+            self._user_images.move_to_end(user_id)
+            while len(self._user_images) > self.USER_IMAGES_CACHE_SIZE:
+                self._user_images.popitem(last=False)
+        return items
+
+    def _invalidate_user_images(self, user_id: Optional[str]) -> None:
+        """Forget cached images for a user, and any query already in flight."""
+        self._user_images.pop(user_id, None)
+        self._user_images_queries.pop(user_id, None)
 
     async def update_image_cluster(
         self,
@@ -195,42 +509,75 @@ class DynamoDBService:
         Passing None for a field removes that attribute.
         """
         try:
-            client = await self._get_client()
-            async with client as dynamodb:
-                set_parts = []
-                remove_parts = []
-                expr_vals: Dict[str, Any] = {}
-
-                if cluster_id is not None:
-                    set_parts.append("cluster_id = :cid")
-                    expr_vals[":cid"] = {"N": str(cluster_id)}
-                else:
-                    remove_parts.append("cluster_id")
-
-                if cluster_name is not None:
-                    set_parts.append("cluster_name = :cname")
-                    expr_vals[":cname"] = {"S": cluster_name}
-                else:
-                    remove_parts.append("cluster_name")
-
-                update_expr_sections = []
-                if set_parts:
-                    update_expr_sections.append("SET " + ", ".join(set_parts))
-                if remove_parts:
-                    update_expr_sections.append("REMOVE " + ", ".join(remove_parts))
-                update_expression = " ".join(update_expr_sections)
-
-                await dynamodb.update_item(
-                    TableName=self.settings.DYNAMODB_TABLE_NAME,
-                    Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
-                    UpdateExpression=update_expression,
-                    ExpressionAttributeValues=expr_vals or None,
-                )
+            dynamodb = await self._get_client()
+            set_parts = []
+            remove_parts = []
+            expr_vals: Dict[str, Any] = {}
+
+            if cluster_id is not None:
+                set_parts.append("cluster_id = :cid")
+                expr_vals[":cid"] = {"N": str(cluster_id)}
+            else:
+                remove_parts.append("cluster_id")
+
+            if cluster_name is not None:
+                set_parts.append("cluster_name = :cname")
+                expr_vals[":cname"] = {"S": cluster_name}
+            else:
+                remove_parts.append("cluster_name")
+
+            update_expr_sections = []
+            if set_parts:
+                update_expr_sections.append("SET " + ", ".join(set_parts))
+            if remove_parts:
+                update_expr_sections.append("REMOVE " + ", ".join(remove_parts))
+            update_expression = " ".join(update_expr_sections)
+
+            await dynamodb.update_item(
+                TableName=self.settings.DYNAMODB_TABLE_NAME,
+                Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
+                UpdateExpression=update_expression,
+                ExpressionAttributeValues=expr_vals or None,
+            )
+            self._invalidate_user_images(user_id)
             logger.debug("Updated cluster for user %s image %s -> id=%s name=%s", user_id, image_id, cluster_id, cluster_name)
         except ClientError:
             logger.exception("Failed to update image cluster assignment")
             raise
 
+    async def set_cluster_name(
+        self,
+        user_id: str,
+        image_id: str,
+        cluster_id: int,
+        cluster_name: str,
+    ) -> bool:
+        """Name an image's cluster, only if the image is still in ``cluster_id``.
+
+        For names generated after the assignment: if the image has since been
+        moved (e.g. by re-clustering), the write is skipped rather than
+        labelling its new cluster with a stale name. Returns whether the name
+        was written.
+        """
+        try:
+            dynamodb = await self._get_client()
+            await dynamodb.update_item(
+                TableName=self.settings.DYNAMODB_TABLE_NAME,
+                Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
+                UpdateExpression="SET cluster_name = :cname",
+                ConditionExpression="cluster_id = :cid",
+                ExpressionAttributeValues={":cname": {"S": cluster_name}, ":cid": {"N": str(cluster_id)}},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                logger.debug("Image %s left cluster %s before it was named", image_id, cluster_id)
+                return False
+            logger.exception("Failed to set cluster name")
+            raise
+        self._invalidate_user_images(user_id)
+        logger.debug("Named cluster %s for user %s image %s: %s", cluster_id, user_id, image_id, cluster_name)
+        return True
+
     async def bulk_update_image_clusters(
         self,
         user_id: str,
@@ -243,39 +590,119 @@ class DynamoDBService:
         cluster_names maps cluster_id -> name and is applied where available.
         """
         cluster_names = cluster_names or {}
+        slots = asyncio.Semaphore(self.BULK_UPDATE_CONCURRENCY)
+
+        async def _update_one(dynamodb, image_id: str, cid: Optional[int]) -> None:
+            set_parts = []
+            remove_parts = []
+            expr_vals: Dict[str, Any] = {}
+
+            if cid is not None:
+                set_parts.append("cluster_id = :cid")
+                expr_vals[":cid"] = {"N": str(cid)}
+                # apply name when provided; else keep existing if any
+                cname = cluster_names.get(cid)
+                if cname is not None:
+                    set_parts.append("cluster_name = :cname")
+                    expr_vals[":cname"] = {"S": cname}
+            else:
+                remove_parts.extend(["cluster_id", "cluster_name"])
+
+            update_expr_sections = []
+            if set_parts:
+                update_expr_sections.append("SET " + ", ".join(set_parts))
+            if remove_parts:
+                update_expr_sections.append("REMOVE " + ", ".join(remove_parts))
+            update_kwargs: Dict[str, Any] = {"UpdateExpression": " ".join(update_expr_sections)}
+            if expr_vals:
+                update_kwargs["ExpressionAttributeValues"] = expr_vals
+
+            async with slots:
+                await dynamodb.update_item(
+                    TableName=self.settings.DYNAMODB_TABLE_NAME,
+                    Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
+                    **update_kwargs,
+                )
+
         try:
-            client = await self._get_client()
-            async with client as dynamodb:
-                for image_id, cid in assignments.items():
-                    set_parts = []
-                    remove_parts = []
-                    expr_vals: Dict[str, Any] = {}
-
-                    if cid is not None:
-                        set_parts.append("cluster_id = :cid")
-                        expr_vals[":cid"] = {"N": str(cid)}
-                        # apply name when provided; else keep existing if any
-                        cname = cluster_names.get(cid)
-                        if cname is not None:
-                            set_parts.append("cluster_name = :cname")
-                            expr_vals[":cname"] = {"S": cname}
-                    else:
-                        remove_parts.extend(["cluster_id", "cluster_name"])
-
-                    update_expr_sections = []
-                    if set_parts:
-                        update_expr_sections.append("SET " + ", ".join(set_parts))
-                    if remove_parts:
-                        update_expr_sections.append("REMOVE " + ", ".join(remove_parts))
-                    update_expression = " ".join(update_expr_sections)
-
-                    await dynamodb.update_item(
-                        TableName=self.settings.DYNAMODB_TABLE_NAME,
-                        Key={"user_id": {"S": user_id}, "image_id": {"S": image_id}},
-                        UpdateExpression=update_expression,
-                        ExpressionAttributeValues=expr_vals or None,
-                    )
+            dynamodb = await self._get_client()
+            # Independent items: run the round trips concurrently, and let
+            # every update finish before reporting the first failure.
+            results = await asyncio.gather(
+                *(_update_one(dynamodb, image_id, cid) for image_id, cid in assignments.items()),
+                return_exceptions=True,
+            )
+            # Even a partly failed bulk update has changed some items
+            self._invalidate_user_images(user_id)
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                logger.error("%d of %d cluster updates failed for user %s", len(errors), len(assignments), user_id)
+                raise errors[0]
             logger.info("Bulk updated %d image cluster assignments for user %s", len(assignments), user_id)
         except ClientError:
             logger.exception("Failed bulk update of image cluster assignments")
             raise
+
+
+class BatchWriter:
+    """Coalesces concurrent record puts into BatchWriteItem calls.
+
+    ``put`` queues a record and returns once that record is written, or
+    raises if it could not be, so callers keep add_image_record semantics.
+    A batch is sent as soon as it is full, or ``flush_interval`` seconds
+    after its first record arrived. Leaving the ``async with`` block sends
+    whatever is still pending and waits for all batches.
+    """
+
+    def __init__(self, db_service: DynamoDBService, flush_interval: float):
+        self._db = db_service
+        self._flush_interval = flush_interval
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "BatchWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def put(self, record: Dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((record, future))
+        if len(self._pending) >= self._db.BATCH_WRITE_SIZE:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._flush_interval, self._flush)
+        await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            unprocessed = await self._db._put_batch([record for record, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        failed = {id(record) for record in unprocessed}
+        for record, future in batch:
+            if future.done():
+                continue
+            if id(record) in failed:
+                future.set_exception(RuntimeError(f"Image record {record.get('image_id')} was not written"))
+            else:
+                future.set_result(None)
@@ -1,19 +1,37 @@
-import base64
 import logging
 from langchain_openai import AzureChatOpenAI
 from langchain.schema import HumanMessage
 from app.core.config import Settings
-from app.core.logging_config import setup_logging
-
-setup_logging()
+from app.core.retry import async_retry
+from app.services.cache import LRUCache, content_key
+from app.services.clients import get_openai_http_client
 
 logger = logging.getLogger(__name__)
 
+# pybase64 is a drop-in, SIMD-accelerated b64encode; use it when installed
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+def _image_mime_type(image_bytes: bytes) -> str:
+    """Guess the data URL media type from the image's magic bytes (JPEG if unknown)."""
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_bytes.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
 class DescriptionService:
     """
     A service to generate detailed descriptions for images using Azure OpenAI.
     """
 
+    # Descriptions of recently seen images, keyed by a hash of the model input
+    CACHE_SIZE = 1024
+
     def __init__(self, settings: Settings):
         """
         Initializes the DescriptionService with Azure OpenAI credentials.
@@ -32,11 +50,14 @@ class DescriptionService:
                 azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT,
                 api_key=self.settings.AZURE_OPENAI_API_KEY.get_secret_value(),
                 max_tokens=1024,
+                max_retries=0,  # retried by async_retry instead
+                http_async_client=get_openai_http_client(),
             )
             logger.info("AzureChatOpenAI model initialized successfully.")
         except Exception as e:
-            logger.error(f"Failed to initialize AzureChatOpenAI model: {e}", exc_info=True)
+            logger.error("Failed to initialize AzureChatOpenAI model: %s", e, exc_info=True)
             raise
+        self._cache: LRUCache[str] = LRUCache(self.CACHE_SIZE)
 
     async def generate_image_description(self, image_bytes: bytes) -> str:
         """
@@ -48,24 +69,35 @@ class DescriptionService:
         Returns:
             A string containing the detailed description of the image.
         """
+        key = content_key(image_bytes)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug("Reusing cached description for identical image content.")
+            return cached
         try:
-            base64_image = base64.b64encode(image_bytes).decode("utf-8")
+            base64_image = base64.b64encode(image_bytes).decode("ascii")
+            mime_type = _image_mime_type(image_bytes)
 
             logger.info("Invoking model to generate image description.")
-            response = await self.model.ainvoke(
+            response = await self._invoke(
                 [
                     HumanMessage(
                         content=[
                             {"type": "text", "text": "Provide a detailed description of this image."},
-                            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}},
+                            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}},
                         ]
                     )
                 ]
             )
             logger.info("Successfully received description from model.")
-            return str(response.content)
+            description = str(response.content)
+            self._cache.put(key, description)
+            return description
         except Exception as e:
-            logger.error(f"Error generating image description: {e}", exc_info=True)
+            logger.error("Error generating image description: %s", e, exc_info=True)
             raise
 
-    
\ No newline at end of file
+    @async_retry()
+    async def _invoke(self, messages):
+        """Call the model, retrying transient failures with backoff."""
+        return await self.model.ainvoke(messages)
@@ -1,11 +1,12 @@
+import asyncio
 import logging
-from typing import List
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
 from langchain_openai import AzureOpenAIEmbeddings
 from app.core.config import get_settings
-from app.core.logging_config import setup_logging
-import base64
-
-setup_logging()
+from app.core.retry import async_retry
+from app.services.cache import LRUCache, content_key
+from app.services.clients import get_openai_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,13 @@ class EmbeddingService:
     A service to generate embeddings for text using Azure OpenAI.
     """
 
+    # Micro-batching: coalesce concurrent requests into one API call
+    MAX_BATCH_SIZE = 32
+    MAX_BATCH_WAIT = 0.01  # seconds
+    # Embeddings of recently seen texts, keyed by a hash of the text. Stored
+    # as packed doubles (~12 KB at 1536 dims) rather than lists of floats.
+    CACHE_SIZE = 1024
+
     def __init__(self):
         """
         Initializes the EmbeddingService with Azure OpenAI credentials.
@@ -27,16 +35,33 @@ class EmbeddingService:
                 azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT,
                 api_key=self.settings.AZURE_OPENAI_API_KEY.get_secret_value(),
                 check_embedding_ctx_length=False,
+                dimensions=self.settings.AZURE_OPENAI_EMBEDDING_DIMENSIONS,
+                max_retries=0,  # retried by async_retry instead
+                http_async_client=get_openai_http_client(),
             )
             logger.info("AzureOpenAIEmbeddings model initialized successfully.")
         except Exception as e:
-            logger.error(f"Failed to initialize AzureOpenAIEmbeddings model: {e}", exc_info=True)
+            logger.error("Failed to initialize AzureOpenAIEmbeddings model: %s", e, exc_info=True)
             raise
 
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+        # Batches sent but not yet answered; several may be in flight at once
+        self._inflight: Set[asyncio.Task] = set()
+        self._cache: LRUCache[array] = LRUCache(self.CACHE_SIZE)
+        # Text key -> the queued request for it, joined by concurrent callers
+        self._pending: Dict[bytes, asyncio.Future] = {}
+
     async def generate_embedding(self, text: str) -> List[float]:
         """
         Generates an embedding for a given text string.
 
+        Concurrent calls are coalesced by a background worker into a single
+        batched request (see ``_batch_worker``), so callers get batching
+        without any change at the call site. Recently embedded texts are
+        served from memory, and concurrent calls for the same text wait on
+        one request rather than each sending it.
+
         Args:
             text: The text to embed.
 
@@ -47,53 +72,120 @@ class EmbeddingService:
             logger.warning("generate_embedding called with empty text.")
             return []
 
-        # Retry loop with exponential backoff to handle transient proxy / network errors
-        max_attempts = 3
-        backoff_base = 0.5
-        last_exc: Exception | None = None
-
-        for attempt in range(1, max_attempts + 1):
-            try:
-                logger.info("Generating embedding for text (attempt %d/%d).", attempt, max_attempts)
-                embedding = await self.model.aembed_query(text)
-                logger.info("Successfully generated embedding of dimension %d.", len(embedding))
-                return embedding
-            except Exception as e:
-                last_exc = e
-                msg = str(e)
-                # Log with context; when the proxy returns 502/Bad Gateway or the
-                # downstream reports 'No route', these are often transient.
-                if '502' in msg or 'Bad Gateway' in msg or 'No route' in msg:
-                    logger.warning(
-                        "Transient error while generating embedding (attempt %d/%d): %s",
-                        attempt, max_attempts, msg,
-                    )
-                else:
-                    logger.exception("Error generating embedding (attempt %d/%d): %s", attempt, max_attempts, msg)
-
-                # If this was the last attempt, break and return fallback
-                if attempt == max_attempts:
-                    break
+        key = content_key(text.encode())
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        # Identical texts requested concurrently share one queued request
+        future = self._pending.get(key)
+        if future is None:
+            if self._batch_task is None or self._batch_task.done():
+                self._batch_task = asyncio.create_task(self._batch_worker())
+
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            future.add_done_callback(lambda f: self._settle(key, f))
+            await self._queue.put((text, future))
+        # shield: one caller being cancelled must not fail the others
+        return list(await asyncio.shield(future))
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates embeddings for several texts, in order.
+
+        Goes through the same cache and micro-batcher as
+        ``generate_embedding``, so N new texts cost about
+        ``N / MAX_BATCH_SIZE`` API calls rather than N.
+
+        Args:
+            texts: The texts to embed.
+
+        Returns:
+            One embedding per text (empty for empty or failed texts).
+        """
+        return list(await asyncio.gather(*(self.generate_embedding(text) for text in texts)))
 
-                # Backoff before retrying
+    def _settle(self, key: bytes, future: asyncio.Future) -> None:
+        """Retire a finished request and cache its embedding."""
+        self._pending.pop(key, None)
+        # Failed batches resolve to [], which must not be remembered
+        if not future.cancelled() and future.result():
+            self._cache.put(key, array("d", future.result()))
+
+    async def _batch_worker(self) -> None:
+        """Drain the request queue in batches and dispatch each batch.
+
+        After the first request arrives the worker keeps collecting until
+        ``MAX_BATCH_SIZE`` texts are queued or ``MAX_BATCH_WAIT`` seconds have
+        passed, whichever comes first. Each batch is sent as its own task, so
+        requests arriving during a slow API call start the next batch instead
+        of waiting for it.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.MAX_BATCH_WAIT
+            while len(batch) < self.MAX_BATCH_SIZE:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
                 try:
-                    await __import__('asyncio').sleep(backoff_base * (2 ** (attempt - 1)))
-                except Exception:
-                    pass
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed one batch and resolve each caller's future."""
+        try:
+            embeddings = await self._embed_batch([text for text, _ in batch])
+        except Exception:  # fail this batch only
+            logger.exception("Unexpected error in embedding batch worker")
+            embeddings = [[] for _ in batch]
 
-        # Final fallback: return an empty embedding rather than raising so the
-        # request can continue downstream (record will be stored without embedding).
-        logger.error("Failed to generate embedding after %d attempts; returning empty embedding. Last error: %s", max_attempts, last_exc)
-        return []
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts in one request, returning one vector per text."""
+        try:
+            return await self._request_embeddings(texts)
+        except Exception as e:
+            # Return empty embeddings rather than raising so the request can
+            # continue downstream (record will be stored without embedding).
+            logger.error("Failed to generate embeddings; returning empty embeddings. Last error: %s", e)
+            return [[] for _ in texts]
+
+    @async_retry()
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """One embeddings API call; transient failures are retried with backoff."""
+        logger.info("Generating embeddings for %d texts.", len(texts))
+        embeddings = await self.model.aembed_documents(texts)
+        logger.info("Successfully generated %d embeddings of dimension %d.", len(embeddings), len(embeddings[0]))
+        return embeddings
 
 if __name__ == "__main__":
-    import asyncio
-    from app.core.config import get_settings
     from app.core.logging_config import setup_logging
 
+    async def main():
+        # One event loop for the whole run: the service's batch worker and the
+        # shared HTTP client are created, used and closed on the same loop.
+        embedding_service = EmbeddingService()
+        sample_text = "This is a sample text to test the embedding service."
+        try:
+            embedding = await embedding_service.generate_embedding(sample_text)
+        finally:
+            await get_openai_http_client().aclose()
+        logger.info("Generated embedding: %s... (first 5 dimensions)", embedding[:5])
+
     setup_logging()
-    settings = get_settings()
-    embedding_service = EmbeddingService(settings)
-    sample_text = "This is a sample text to test the embedding service."
-    embedding = asyncio.run(embedding_service.generate_embedding(sample_text))
-    logger.info(f"Generated embedding: {embedding[:5]}... (first 5 dimensions)")
+    asyncio.run(main())
+
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (256, 256)
+# Azure OpenAI vision models fit images within 2048x2048 and then scale the
+# shortest side to 768px, so anything larger is detail the model never sees.
+MODEL_INPUT_MAX_SIDE = 2048
+MODEL_INPUT_SHORT_SIDE = 768
+
+
+def _render_derivatives(image_content: bytes) -> Tuple[bytes, bytes]:
+    """CPU-bound rendering of everything an upload needs from its pixels.
+
+    Runs inside a worker process, so it takes and returns plain bytes
+    (picklable) rather than file objects. Returns ``(thumbnail, model_input)``
+    JPEG bytes from a single decode: the image is decoded once at the
+    resolution the vision model uses (see ``MODEL_INPUT_*``) and the
+    thumbnail is derived from that, instead of shipping the original to a
+    worker and decoding it twice.
+
+    For JPEGs, ``draft`` lets libjpeg decode directly at 1/2, 1/4 or 1/8
+    scale, so we never materialize the full-resolution pixels we would
+    throw away anyway. It is a no-op for other formats. Either output is
+    the original bytes when those are already a small enough JPEG.
+    """
+    img = Image.open(BytesIO(image_content))
+    width, height = img.size
+    is_rgb_jpeg = img.format == "JPEG" and img.mode == "RGB"
+    if is_rgb_jpeg and width <= THUMBNAIL_SIZE[0] and height <= THUMBNAIL_SIZE[1]:
+        # Already a thumbnail-sized JPEG: skip the decode/re-encode entirely.
+        return image_content, image_content
+
+    scale = min(1.0, MODEL_INPUT_MAX_SIDE / max(width, height), MODEL_INPUT_SHORT_SIDE / min(width, height))
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    img.draft("RGB", target)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != target:
+        img = img.resize(target, Image.Resampling.BICUBIC)
+
+    if scale == 1.0 and is_rgb_jpeg:
+        model_input = image_content
+    else:
+        out = BytesIO()
+        img.save(out, format="JPEG", quality=90)
+        model_input = out.getvalue()
+
+    # The model-sized image is still several times the thumbnail, which
+    # leaves only a short reduction for the filter; bilinear is
+    # indistinguishable from bicubic there and about twice as fast.
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.BILINEAR)
+    out = BytesIO()
+    # Baseline 4:2:0 without the extra Huffman pass is libjpeg-turbo's fastest
+    # encode; at 256px, quality 80 looks the same as 85 in fewer bytes.
+    img.save(out, format="JPEG", quality=80, optimize=False, progressive=False, subsampling=2)
+    return out.getvalue(), model_input
+
+
+def _worker_ready() -> int:
+    """No-op task used to start worker processes ahead of the first upload."""
+    return os.getpid()
+
+
+class ImageProcessingService:
+    """
+    Runs CPU-bound image work (decode/resize/encode) in a process pool.
+
+    Pillow holds the GIL for part of every decode and encode, so a thread
+    pool caps thumbnailing at roughly one core. Worker processes let
+    concurrent uploads scale across cores.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._pool is None:
+            logger.info("Starting thumbnail process pool with %d workers.", self.max_workers)
+            # forkserver avoids forking the (multi-threaded) server process itself.
+            # Preloading this module imports Pillow once in the fork server, so
+            # each worker starts with it already in memory.
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn`` in the pool, replacing the pool once if it has broken.
+
+        A worker that dies (segfault, OOM kill) breaks the whole pool, and
+        every later submit would fail until the process restarts.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in (1, 2):
+            pool = self._get_pool()
+            try:
+                return await loop.run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                if attempt == 2:
+                    raise
+                logger.warning("Thumbnail process pool broke; restarting it and retrying.")
+
+    def get_dimensions(self, image_content: bytes) -> Optional[Tuple[int, int]]:
+        """Return (width, height) read from the image header, or None.
+
+        ``Image.open`` only parses the header; no pixel data is decoded, so
+        this is cheap enough to run inline on the event loop.
+        """
+        try:
+            with Image.open(BytesIO(image_content)) as img:
+                return img.size
+        except Exception:
+            logger.warning("Could not read image dimensions from header.")
+            return None
+
+    async def create_derivatives(self, image_content: bytes) -> Tuple[bytes, bytes]:
+        """Return ``(thumbnail, model_input)`` JPEG bytes for the given image content."""
+        return await self._run(_render_derivatives, image_content)
+
+    async def warm_up(self) -> None:
+        """Start all worker processes now instead of on the first uploads."""
+        await asyncio.gather(*(self._run(_worker_ready) for _ in range(self.max_workers)))
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if they were ever started."""
+        if self._pool is not None:
+            logger.info("Shutting down thumbnail process pool.")
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
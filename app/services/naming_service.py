@@ -2,11 +2,22 @@ import logging
 from typing import List
 
 from app.core.config import Settings
+from app.core.retry import async_retry
+from app.services.cache import LRUCache, content_key
+from app.services.clients import get_openai_http_client
 from langchain_openai import AzureChatOpenAI
 from langchain.schema import HumanMessage
 
 logger = logging.getLogger(__name__)
 
+# Fixed head of the naming prompt; the numbered descriptions follow it
+PROMPT_PREFIX = "\n".join([
+    "Based on the following image descriptions from a cluster, provide a short, descriptive, and human-readable name for the cluster (2-4 words).",
+    "Examples: Beach Vacations, City Skylines at Night, Pet Portraits, Food Photography.",
+    "Do not include the word 'cluster' or any quotes — return only the name.",
+    "\nDescriptions:\n",
+]) + "\n"
+
 
 class NamingService:
     """Generate short human-readable names for image clusters using Azure OpenAI.
@@ -16,6 +27,11 @@ class NamingService:
     same Azure deployment configuration from settings.
     """
 
+    # Names for recently seen sets of sample descriptions
+    CACHE_SIZE = 1024
+    # Limit samples to a small number to keep prompts compact
+    MAX_SAMPLES = 5
+
     def __init__(self, settings: Settings):
         self.settings = settings
         try:
@@ -26,11 +42,14 @@ class NamingService:
                 api_key=self.settings.AZURE_OPENAI_API_KEY.get_secret_value(),
                 temperature=0.1,
                 max_tokens=128,
+                max_retries=0,  # retried by async_retry instead
+                http_async_client=get_openai_http_client(),
             )
             logger.info("AzureChatOpenAI model initialized for NamingService.")
         except Exception as e:
             logger.error("Failed to initialize AzureChatOpenAI for NamingService: %s", e)
             raise
+        self._cache: LRUCache[str] = LRUCache(self.CACHE_SIZE)
 
     async def generate_cluster_name(self, descriptions: List[str]) -> str:
         """Return a short (2-4 words) human-readable name for a cluster.
@@ -44,28 +63,30 @@ class NamingService:
         if not descriptions:
             return "Unnamed Cluster"
 
-        # Limit samples to a small number to keep prompts compact
-        MAX_SAMPLES = 5
-        samples = descriptions[:MAX_SAMPLES]
-
-        prompt_lines = [
-            "Based on the following image descriptions from a cluster, provide a short, descriptive, and human-readable name for the cluster (2-4 words).",
-            "Examples: Beach Vacations, City Skylines at Night, Pet Portraits, Food Photography.",
-            "Do not include the word 'cluster' or any quotes — return only the name.",
-            "\nDescriptions:\n",
-        ]
+        samples = descriptions[:self.MAX_SAMPLES]
 
-        for i, desc in enumerate(samples, start=1):
-            prompt_lines.append(f"{i}. {desc}")
+        # The same samples in any order get the same name, so key on the
+        # sorted set and skip the model call when it has been named before
+        key = content_key("\0".join(sorted(samples)).encode())
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug("Reusing cached cluster name '%s'", cached)
+            return cached
 
-        prompt_text = "\n".join(prompt_lines)
+        prompt_text = PROMPT_PREFIX + "\n".join(f"{i}. {desc}" for i, desc in enumerate(samples, start=1))
 
         try:
             logger.info("Generating cluster name from %d descriptions.", len(samples))
-            response = await self.llm.ainvoke([HumanMessage(content=prompt_text)])
+            response = await self._invoke([HumanMessage(content=prompt_text)])
             cluster_name = str(response.content).strip().strip('"')
             logger.info("Generated cluster name: '%s'", cluster_name)
+            self._cache.put(key, cluster_name)
             return cluster_name
         except Exception as e:
             logger.exception("Failed to generate cluster name using Azure OpenAI")
-            return "Unnamed Cluster"
\ No newline at end of file
+            return "Unnamed Cluster"
+
+    @async_retry()
+    async def _invoke(self, messages):
+        """Call the model, retrying transient failures with backoff."""
+        return await self.llm.ainvoke(messages)
@@ -1,19 +1,45 @@
+import asyncio
+import io
 import logging
-from typing import Optional
-from aiobotocore.session import get_session
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError
 from fastapi import UploadFile
 
 from app.core.config import Settings
+from app.services.clients import AWS_RETRIES, get_aws_session
 
 logger = logging.getLogger(__name__)
 
 class S3Service:
+    # Presigned URLs for a key stay valid until they expire, so reuse them
+    # rather than re-signing (HMAC-SHA256) on every listing.
+    PRESIGNED_URL_EXPIRES_IN = 3600
+    PRESIGNED_URL_REUSE_FOR = 3300  # stop handing a URL out ~5 minutes before it expires
+    PRESIGNED_URL_CACHE_SIZE = 50_000
+    # Large originals are sent as multipart uploads, a few parts at a time
+    MULTIPART_THRESHOLD = 8 * 1024 * 1024
+    MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+    MULTIPART_CONCURRENCY = 4
+    # Fail fast on an unreachable endpoint; the read timeout leaves room for
+    # S3 to acknowledge a full multipart chunk
+    CONNECT_TIMEOUT = 2
+    READ_TIMEOUT = 30
+
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.session = get_session()
+        self.session = get_aws_session()
+        # object_key -> (url, monotonic deadline), kept in LRU order
+        self._url_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # One long-lived client for all calls (see _get_client)
+        self._client = None
+        self._client_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
 
-    async def _get_client(self):
+    def _create_client(self):
+        """Create an async S3 client (to be entered as a context manager)."""
         client_kwargs = {
             "region_name": self.settings.S3_REGION,
             "aws_access_key_id": self.settings.AWS_ACCESS_KEY_ID,
@@ -28,53 +54,182 @@ class S3Service:
             if self.settings.S3_ADDRESSING_STYLE in {"virtual", "path"}
             else "virtual"
         )
-        client_kwargs["config"] = BotoConfig(signature_version="s3v4", s3={"addressing_style": addressing_style})
+        client_kwargs["config"] = BotoConfig(
+            signature_version="s3v4",
+            s3={"addressing_style": addressing_style},
+            max_pool_connections=self.settings.AWS_MAX_POOL_CONNECTIONS,
+            # Keepalive probes stop idle pooled connections being dropped
+            # silently by NATs/load balancers, which would cost a new handshake
+            tcp_keepalive=True,
+            connect_timeout=self.CONNECT_TIMEOUT,
+            read_timeout=self.READ_TIMEOUT,
+            retries=AWS_RETRIES,
+        )
         return self.session.create_client("s3", **client_kwargs)
 
+    async def _get_client(self):
+        """Return the shared S3 client, creating it on first use.
+
+        Building a client (endpoint resolution, service model loading, a
+        fresh connection pool) costs far more than most of the calls made
+        with it, so one client and its warm connections serve every
+        request, presigning included. It is closed in close().
+        """
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    stack = AsyncExitStack()
+                    self._client = await stack.enter_async_context(self._create_client())
+                    self._client_stack = stack
+        return self._client
+
+    async def warm_up(self) -> None:
+        """Create the shared client now instead of on the first request."""
+        await self._get_client()
+
+    async def close(self) -> None:
+        """Close the shared client, if it was created."""
+        if self._client_stack is not None:
+            await self._client_stack.aclose()
+            self._client = None
+            self._client_stack = None
+
+    def _get_cached_url(self, object_key: str) -> Optional[str]:
+        """Return a still-fresh cached presigned URL for the key, if any."""
+        cached = self._url_cache.get(object_key)
+        if cached is None:
+            return None
+        url, deadline = cached
+        if time.monotonic() >= deadline:
+            del self._url_cache[object_key]
+            return None
+        self._url_cache.move_to_end(object_key)
+        return url
+
+    def _cache_url(self, object_key: str, url: str) -> None:
+        self._url_cache[object_key] = (url, time.monotonic() + self.PRESIGNED_URL_REUSE_FOR)
+        self._url_cache.move_to_end(object_key)
+        while len(self._url_cache) > self.PRESIGNED_URL_CACHE_SIZE:
+            self._url_cache.popitem(last=False)
+
     async def generate_presigned_get_url(self, object_key: str) -> Optional[str]:
         if not object_key:
             return None
+        url = self._get_cached_url(object_key)
+        if url is not None:
+            return url
         try:
-            async with await self._get_client() as client:
-                url = await client.generate_presigned_url(
-                    'get_object',
-                    Params={'Bucket': self.settings.S3_BUCKET, 'Key': object_key},
-                    ExpiresIn=3600
-                )
-                logger.debug(f"Generated presigned GET URL for {object_key}")
-                return url
+            client = await self._get_client()
+            url = await client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.settings.S3_BUCKET, 'Key': object_key},
+                ExpiresIn=self.PRESIGNED_URL_EXPIRES_IN
+            )
+            logger.debug("Generated presigned GET URL for %s", object_key)
+            self._cache_url(object_key, url)
+            return url
         except ClientError as e:
-            logger.error(f"Failed to generate presigned GET URL for {object_key}: {e}")
+            logger.error("Failed to generate presigned GET URL for %s: %s", object_key, e)
             return None
 
+    def _object_args(self, object_key: str, content_type: str) -> Dict[str, str]:
+        """Common arguments for PutObject and CreateMultipartUpload."""
+        args = {
+            "Bucket": self.settings.S3_BUCKET,
+            "Key": object_key,
+            "ContentType": content_type,
+        }
+        # Optional ACL if bucket policy requires ownership control
+        if self.settings.S3_ACL:
+            args["ACL"] = self.settings.S3_ACL
+        # Optional server-side encryption
+        if self.settings.S3_SERVER_SIDE_ENCRYPTION:
+            args["ServerSideEncryption"] = self.settings.S3_SERVER_SIDE_ENCRYPTION
+            if (
+                self.settings.S3_SERVER_SIDE_ENCRYPTION == "aws:kms"
+                and self.settings.S3_SSE_KMS_KEY_ID
+            ):
+                args["SSEKMSKeyId"] = self.settings.S3_SSE_KMS_KEY_ID
+        return args
+
     async def upload_fileobj(self, file_obj, object_key: str, content_type: str) -> None:
+        """Uploads a seekable file object to S3.
+
+        Objects above MULTIPART_THRESHOLD are sent as a multipart upload,
+        read and sent one part at a time, instead of as one large PUT body.
+        Smaller ones hand the file object itself to PutObject, which streams
+        it rather than holding a full copy of its contents.
+        """
         try:
-            client = await self._get_client()
-            async with client as s3_client:
-                file_obj.seek(0)
-                data = file_obj.read()
-                put_kwargs = {
-                    "Bucket": self.settings.S3_BUCKET,
-                    "Key": object_key,
-                    "Body": data,
-                    "ContentType": content_type,
-                }
-                # Optional ACL if bucket policy requires ownership control
-                if self.settings.S3_ACL:
-                    put_kwargs["ACL"] = self.settings.S3_ACL
-                # Optional server-side encryption
-                if self.settings.S3_SERVER_SIDE_ENCRYPTION:
-                    put_kwargs["ServerSideEncryption"] = self.settings.S3_SERVER_SIDE_ENCRYPTION
-                    if (
-                        self.settings.S3_SERVER_SIDE_ENCRYPTION == "aws:kms"
-                        and self.settings.S3_SSE_KMS_KEY_ID
-                    ):
-                        put_kwargs["SSEKMSKeyId"] = self.settings.S3_SSE_KMS_KEY_ID
-
-                await s3_client.put_object(**put_kwargs)
-                logger.info(f"Successfully uploaded file object to S3 key {object_key}")
+            s3_client = await self._get_client()
+            file_obj.seek(0, io.SEEK_END)
+            size = file_obj.tell()
+            file_obj.seek(0)
+            if size > self.MULTIPART_THRESHOLD:
+                await self._multipart_upload(s3_client, file_obj, object_key, content_type)
+            else:
+                await s3_client.put_object(Body=file_obj, **self._object_args(object_key, content_type))
+            logger.info("Successfully uploaded file object to S3 key %s", object_key)
         except ClientError as e:
-            logger.error(f"Failed to upload file object to S3: {e}")
+            logger.error("Failed to upload file object to S3: %s", e)
+            raise
+
+    async def _multipart_upload(self, s3_client, file_obj, object_key: str, content_type: str) -> None:
+        """Streams file_obj to S3 in MULTIPART_CHUNK_SIZE parts.
+
+        At most MULTIPART_CONCURRENCY parts are read and in flight at once,
+        which bounds memory regardless of object size. The upload is aborted
+        on any failure so no orphaned parts are left behind.
+        """
+        upload = await s3_client.create_multipart_upload(**self._object_args(object_key, content_type))
+        upload_id = upload["UploadId"]
+        slots = asyncio.Semaphore(self.MULTIPART_CONCURRENCY)
+
+        async def _upload_part(part_number: int, chunk: bytes) -> Dict[str, object]:
+            try:
+                response = await s3_client.upload_part(
+                    Bucket=self.settings.S3_BUCKET,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        tasks: List[asyncio.Task] = []
+        try:
+            part_number = 1
+            while True:
+                await slots.acquire()
+                chunk = file_obj.read(self.MULTIPART_CHUNK_SIZE)
+                if not chunk:
+                    slots.release()
+                    break
+                tasks.append(asyncio.create_task(_upload_part(part_number, chunk)))
+                part_number += 1
+            parts = await asyncio.gather(*tasks)
+            await s3_client.complete_multipart_upload(
+                Bucket=self.settings.S3_BUCKET,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            logger.debug("Completed multipart upload of %d parts to S3 key %s", len(parts), object_key)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Let cancelled parts finish before aborting; a part completing
+            # after the abort would be left behind
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A failed abort must not replace the error that caused it
+            try:
+                await s3_client.abort_multipart_upload(
+                    Bucket=self.settings.S3_BUCKET, Key=object_key, UploadId=upload_id
+                )
+            except Exception:
+                logger.exception("Failed to abort multipart upload %s for S3 key %s", upload_id, object_key)
             raise
 
     async def get_object(self, object_key: str) -> Optional[bytes]:
@@ -82,17 +237,56 @@ class S3Service:
         if not object_key:
             return None
         try:
-            client = await self._get_client()
-            async with client as s3_client:
-                response = await s3_client.get_object(
-                    Bucket=self.settings.S3_BUCKET, Key=object_key
-                )
-                content = await response["Body"].read()
-                logger.debug(f"Successfully retrieved object from S3 key {object_key}")
-                return content
+            s3_client = await self._get_client()
+            response = await s3_client.get_object(
+                Bucket=self.settings.S3_BUCKET, Key=object_key
+            )
+            content = await response["Body"].read()
+            logger.debug("Successfully retrieved object from S3 key %s", object_key)
+            return content
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                logger.warning("Object not found at S3 key %s", object_key)
+            else:
+                logger.error("Failed to get object from S3: %s", e)
+            return None
+
+    async def stream_object(
+        self, object_key: str, chunk_size: int = 64 * 1024
+    ) -> Optional[Tuple[AsyncIterator[bytes], Dict[str, str]]]:
+        """Opens an S3 object for streaming instead of buffering it in memory.
+
+        Returns a tuple of (chunk iterator, response headers), or None if the
+        object does not exist. The response body holds one of the shared
+        client's connections until the iterator is exhausted or closed.
+        """
+        if not object_key:
+            return None
+        try:
+            s3_client = await self._get_client()
+            response = await s3_client.get_object(
+                Bucket=self.settings.S3_BUCKET, Key=object_key
+            )
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
-                logger.warning(f"Object not found at S3 key {object_key}")
+                logger.warning("Object not found at S3 key %s", object_key)
             else:
-                logger.error(f"Failed to get object from S3: {e}")
+                logger.error("Failed to get object from S3: %s", e)
             return None
+
+        headers: Dict[str, str] = {}
+        if response.get("ContentLength") is not None:
+            headers["Content-Length"] = str(response["ContentLength"])
+        if response.get("ETag"):
+            headers["ETag"] = response["ETag"]
+
+        async def _iter_body() -> AsyncIterator[bytes]:
+            body = response["Body"]
+            try:
+                async for chunk in body.iter_chunks(chunk_size):
+                    yield chunk
+                logger.debug("Streamed object from S3 key %s", object_key)
+            finally:
+                body.close()
+
+        return _iter_body(), headers
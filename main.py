@@ -1,12 +1,26 @@
+import asyncio
 import logging
+import PIL
+import httpx
+from PIL import features as pil_features
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.deps import (
+    get_auth_service,
+    get_db_service,
+    get_description_service,
+    get_embedding_service,
+    get_image_processing_service,
+    get_naming_service,
+    get_s3_service,
+)
 from app.api.routers import auth, images
 from app.core.config import get_settings
 from app.core.logging_config import setup_logging
+from app.services.clients import get_openai_http_client
 
 # --- Application Setup ---
 setup_logging()  # Initialize logging first
@@ -53,9 +67,40 @@ async def read_root():
 @app.on_event("startup")
 async def startup_event():
     logger.info("--- Starting FastAPI application ---")
-    logger.info(f"Log level set to: {settings.LOG_LEVEL}")
+    # One pooled HTTP client for outbound calls (e.g. Firebase sign-in) so
+    # requests reuse warm TCP/TLS connections.
+    app.state.http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        timeout=httpx.Timeout(10.0),
+    )
+    logger.info("Log level set to: %s", settings.LOG_LEVEL)
+    # Build the cached model clients now, so settings and secrets are read
+    # once at boot instead of on the first upload request.
+    try:
+        get_description_service()
+        get_embedding_service()
+        get_naming_service()
+    except Exception:
+        logger.exception("Failed to initialize model clients at startup; retrying on first use.")
+    # Likewise the AWS clients (tens of ms each to build) and the auth service
+    try:
+        get_auth_service()
+        await asyncio.gather(get_s3_service().warm_up(), get_db_service().warm_up())
+    except Exception:
+        logger.exception("Failed to initialize AWS clients at startup; retrying on first use.")
+    await get_image_processing_service().warm_up()
+    logger.info(
+        "Using Pillow %s for thumbnails (libjpeg-turbo: %s)",
+        PIL.__version__,
+        pil_features.version_feature("libjpeg_turbo") or "not available",
+    )
     logger.info("Application startup complete.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("--- Shutting down FastAPI application ---")
+    await app.state.http_client.aclose()
+    await get_openai_http_client().aclose()
+    await get_s3_service().close()
+    await get_db_service().close()
+    get_image_processing_service().shutdown()